@@ -4,21 +4,36 @@ Production-ready FastAPI backend for resume analysis and career guidance.
 """
 
 import os
-import tempfile
-from typing import Optional
+import asyncio
+from typing import Callable, List, Optional, Tuple, Union
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, Form, Query, Depends, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
 
-from services.resume_parser import ResumeParser
+from services.resume_parser import ResumeParser, shutdown_page_pool
+from services.parse_sandbox import ParseSandbox
 from services.embedder import Embedder
 from services.scorer import ResumeScorer
 from services.llm_reasoner import LLMReasoner
+from services.result_cache import ResultCache
+from services.executor import StageExecutor
+from services.pipeline import PipelineRun, StageGraph
+from services.streaming import OrderedEventStream, format_ndjson, format_sse
+from services.job_queue import JobQueue, QueueFullError
+from services.readiness import ReadinessTracker
 from utils.skill_extractor import SkillExtractor
 from utils.text_cleaner import TextCleaner
+from utils.parsed_document import ParsedDocument
+from utils.uploads import (
+    FORM_OVERHEAD_BYTES,
+    MAX_UPLOAD_BYTES,
+    MaxBodySizeMiddleware,
+    keep_uploads_in_memory,
+    read_upload
+)
 
 
 # Global instances (initialized on startup)
@@ -26,23 +41,89 @@ embedder: Optional[Embedder] = None
 scorer: Optional[ResumeScorer] = None
 llm_reasoner: Optional[LLMReasoner] = None
 skill_extractor: Optional[SkillExtractor] = None
+result_cache: Optional[ResultCache] = None
+executor: Optional[StageExecutor] = None
+job_queue: Optional[JobQueue] = None
+readiness: Optional[ReadinessTracker] = None
+document_parser: Optional[Union[ParseSandbox, ResumeParser]] = None
+
+
+async def load_models() -> None:
+    """
+    Load the heavy components in worker threads, then start the job workers.
+    
+    Runs in the background so the server binds its port immediately; the
+    readiness probe passes once every component has loaded.
+    """
+    global embedder, scorer, skill_extractor
+    
+    try:
+        embedder, skill_extractor, _ = await asyncio.gather(
+            readiness.load("embedder", Embedder),
+            readiness.load("skill_extractor", SkillExtractor),
+            start_document_parser()
+        )
+        scorer = await readiness.load("scorer", ResumeScorer, embedder)
+        await job_queue.start()
+        readiness.mark_ready("job_queue")
+        print("✅ All services initialized successfully!")
+    except Exception as e:
+        print(f"❌ Service initialization failed: {e}")
+
+
+async def start_document_parser() -> None:
+    """Start the parse sandbox's worker processes, or mark it ready when disabled."""
+    if isinstance(document_parser, ParseSandbox):
+        await readiness.load("parse_sandbox", document_parser.start)
+    else:
+        readiness.mark_ready("parse_sandbox")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize services on startup and cleanup on shutdown."""
-    global embedder, scorer, llm_reasoner, skill_extractor
+    global llm_reasoner, result_cache, executor, job_queue, readiness, document_parser
     
     print("🚀 Initializing AI services...")
-    embedder = Embedder()
-    scorer = ResumeScorer(embedder)
+    readiness = ReadinessTracker(["embedder", "skill_extractor", "scorer", "job_queue", "parse_sandbox"])
     llm_reasoner = LLMReasoner()
-    skill_extractor = SkillExtractor()
-    print("✅ All services initialized successfully!")
+    result_cache = ResultCache()
+    executor = StageExecutor()
+    # Uploads are parsed in sandboxed worker processes (POSIX only) unless the
+    # parse stage is itself configured as a process pool. The workers start
+    # in load_models().
+    sandbox_enabled = os.getenv("PARSE_SANDBOX", "true").lower() == "true" and os.name == "posix"
+    if sandbox_enabled and executor.config["parse"]["kind"] == "thread":
+        document_parser = ParseSandbox()
+    else:
+        document_parser = ResumeParser()
+    job_queue = JobQueue(handlers={
+        "analyze": analyze_job,
+        "skills-gap": skills_gap_job
+    })
+    await llm_reasoner.startup()
+    loader = asyncio.create_task(load_models())
     
     yield
     
     print("🔄 Shutting down services...")
+    loader.cancel()
+    await job_queue.stop()
+    await llm_reasoner.aclose()
+    executor.shutdown(wait=False)
+    shutdown_page_pool(wait=False)
+    if isinstance(document_parser, ParseSandbox):
+        document_parser.close()
+
+
+async def require_models() -> None:
+    """Dependency rejecting requests until the models have loaded."""
+    if readiness is None or not readiness.is_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="Service is starting up. Please retry shortly.",
+            headers={"Retry-After": "5"}
+        )
 
 
 app = FastAPI(
@@ -65,6 +146,283 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Keep capped uploads off disk while the multipart body is parsed
+keep_uploads_in_memory(MAX_UPLOAD_BYTES)
+
+# Reject oversized request bodies while they stream in
+app.add_middleware(
+    MaxBodySizeMiddleware,
+    max_bytes=MAX_UPLOAD_BYTES + FORM_OVERHEAD_BYTES,
+    path_limits={
+        "/analyze/batch": int(os.getenv("MAX_BATCH_BODY_BYTES", 256 * 1024 * 1024))
+    }
+)
+
+SUPPORTED_FORMATS = [".pdf", ".docx", ".doc"]
+
+
+async def read_resume_upload(upload: UploadFile) -> bytes:
+    """
+    Read a resume upload within the size cap and verify its format.
+    
+    The format is sniffed from magic bytes rather than trusted from the filename.
+    """
+    content = await read_upload(upload)
+    
+    if ResumeParser.detect_format(content) not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed: {', '.join(SUPPORTED_FORMATS)}"
+        )
+    
+    return content
+
+
+def build_analysis_graph(
+    on_token: Optional[Callable[[str, str], None]] = None,
+    on_degraded: Optional[Callable[[str], None]] = None
+) -> StageGraph:
+    """
+    Build the stage graph behind /analyze.
+    
+    Each stage starts as soon as its inputs are ready: the resume and the job
+    description are each parsed once into a ParsedDocument (sections, years,
+    keywords, skills) that scoring and skill matching share, and the
+    rejection explanation and the roadmap LLM calls run alongside each other.
+    The roadmap prompt includes the overall score, so it waits for scoring as
+    well as the missing skills.
+    
+    Args:
+        on_token: Optional callback receiving (stage, token) as the LLM
+            stages stream their completions
+        on_degraded: Optional callback receiving the name of an LLM stage
+            that returned fallback output because the LLM was unavailable
+    """
+    cleaner = TextCleaner()
+    
+    def stage_tokens(stage: str) -> Optional[Callable[[str], None]]:
+        if on_token is None:
+            return None
+        return lambda token: on_token(stage, token)
+    
+    def stage_degraded(stage: str) -> Optional[Callable[[], None]]:
+        if on_degraded is None:
+            return None
+        return lambda: on_degraded(stage)
+    
+    async def resume_text(content: bytes, filename: str) -> str:
+        return await executor.run("parse", document_parser.extract_from_bytes, content, filename)
+    
+    async def clean_resume(resume_text: str) -> str:
+        text = await executor.run("clean", cleaner.clean, resume_text)
+        if not text.strip():
+            raise HTTPException(
+                status_code=400,
+                detail="Could not extract text from resume. Please ensure the file is not corrupted."
+            )
+        return text
+    
+    async def resume_doc(clean_resume: str) -> ParsedDocument:
+        return await executor.run("skills", ParsedDocument.parse, clean_resume, "resume", skill_extractor)
+    
+    async def jd_doc(clean_jd: str) -> ParsedDocument:
+        return await executor.run("skills", ParsedDocument.parse, clean_jd, "jd", skill_extractor)
+    
+    async def score_result(resume_doc: ParsedDocument, jd_doc: ParsedDocument) -> dict:
+        return await executor.run("score", scorer.calculate_score, resume_doc, jd_doc)
+    
+    async def jd_skills(jd_doc: ParsedDocument) -> List[str]:
+        return skill_extractor.extract_from_jd(jd_doc)
+    
+    async def resume_skills(resume_doc: ParsedDocument) -> List[str]:
+        return skill_extractor.extract_from_resume(resume_doc)
+    
+    async def missing_skills(resume_skills: List[str], jd_skills: List[str]) -> List[str]:
+        return skill_extractor.find_missing_skills(resume_skills, jd_skills)
+    
+    async def rejection_reasons(
+        score_result: dict,
+        missing_skills: List[str],
+        resume_doc: ParsedDocument,
+        clean_jd: str
+    ) -> List[str]:
+        if score_result["overall_score"] >= 70:
+            return []
+        return await llm_reasoner.explain_rejection(
+            score_result,
+            missing_skills,
+            resume_doc.text,
+            clean_jd,
+            on_token=stage_tokens("rejection_reasons"),
+            on_degraded=stage_degraded("rejection_reasons")
+        )
+    
+    async def learning_roadmap(missing_skills: List[str], score_result: dict, clean_jd: str) -> dict:
+        return await llm_reasoner.generate_roadmap(
+            missing_skills,
+            score_result,
+            clean_jd,
+            on_token=stage_tokens("learning_roadmap"),
+            on_degraded=stage_degraded("learning_roadmap")
+        )
+    
+    return (
+        StageGraph(inputs=["content", "filename", "clean_jd"])
+        .add("resume_text", resume_text, ["content", "filename"])
+        .add("clean_resume", clean_resume, ["resume_text"])
+        .add("resume_doc", resume_doc, ["clean_resume"])
+        .add("jd_doc", jd_doc, ["clean_jd"])
+        .add("score_result", score_result, ["resume_doc", "jd_doc"])
+        .add("jd_skills", jd_skills, ["jd_doc"])
+        .add("resume_skills", resume_skills, ["resume_doc"])
+        .add("missing_skills", missing_skills, ["resume_skills", "jd_skills"])
+        .add("rejection_reasons", rejection_reasons, ["score_result", "missing_skills", "resume_doc", "clean_jd"])
+        .add("learning_roadmap", learning_roadmap, ["missing_skills", "score_result", "clean_jd"])
+    )
+
+
+def analysis_cache_key(content: bytes, clean_jd: str) -> str:
+    """Build the result cache key for an /analyze request."""
+    return ResultCache.make_key(
+        content,
+        clean_jd,
+        scorer.model_key,
+        scorer.weights,
+        llm_reasoner.model
+    )
+
+
+def analysis_response_data(results: dict) -> dict:
+    """Shape analysis graph results into the /analyze response payload."""
+    score_result = results["score_result"]
+    return {
+        "score": score_result["overall_score"],
+        "sub_scores": {
+            "skills_match": score_result["skills_match"],
+            "experience_relevance": score_result["experience_relevance"],
+            "keyword_coverage": score_result["keyword_coverage"],
+            "role_alignment": score_result["role_alignment"]
+        },
+        "rejection_reasons": results["rejection_reasons"],
+        "missing_skills": results["missing_skills"],
+        "present_skills": results["resume_skills"],
+        "required_skills": results["jd_skills"],
+        "learning_roadmap": results["learning_roadmap"]
+    }
+
+
+async def run_analysis(
+    content: bytes,
+    filename: str,
+    job_description: str
+) -> Tuple[dict, Optional[PipelineRun]]:
+    """
+    Run the full analysis for one resume, consulting the result cache first.
+    
+    Args:
+        content: Raw resume bytes
+        filename: Original upload filename
+        job_description: Raw job description text
+        
+    Returns:
+        Tuple of (response data, pipeline run). The run is None on a cache hit.
+    """
+    cleaner = TextCleaner()
+    clean_jd = await executor.run("clean", cleaner.clean, job_description)
+    
+    # Serve repeat requests straight from the result cache
+    cache_key = analysis_cache_key(content, clean_jd)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return cached, None
+    
+    # Run the stage graph; independent stages overlap
+    degraded = []
+    run = await build_analysis_graph(on_degraded=degraded.append).run(
+        content=content,
+        filename=filename,
+        clean_jd=clean_jd
+    )
+    
+    data = analysis_response_data(run.results)
+    # Fallback explanations from an LLM outage must not outlive it
+    if not degraded:
+        result_cache.set(cache_key, data)
+    return data, run
+
+
+def build_skills_gap_graph() -> StageGraph:
+    """Build the stage graph behind /skills-gap."""
+    cleaner = TextCleaner()
+    
+    async def resume_text(content: bytes, filename: str) -> str:
+        return await executor.run("parse", document_parser.extract_from_bytes, content, filename)
+    
+    async def clean_resume(resume_text: str) -> str:
+        return await executor.run("clean", cleaner.clean, resume_text)
+    
+    async def clean_jd(job_description: str) -> str:
+        return await executor.run("clean", cleaner.clean, job_description)
+    
+    async def jd_skills(clean_jd: str) -> List[str]:
+        jd_doc = await executor.run("skills", ParsedDocument.parse, clean_jd, "jd", skill_extractor)
+        return list(jd_doc.skills)
+    
+    async def resume_skills(clean_resume: str) -> List[str]:
+        resume_doc = await executor.run("skills", ParsedDocument.parse, clean_resume, "resume", skill_extractor)
+        return list(resume_doc.skills)
+    
+    async def missing_skills(resume_skills: List[str], jd_skills: List[str]) -> List[str]:
+        return skill_extractor.find_missing_skills(resume_skills, jd_skills)
+    
+    return (
+        StageGraph(inputs=["content", "filename", "job_description"])
+        .add("resume_text", resume_text, ["content", "filename"])
+        .add("clean_resume", clean_resume, ["resume_text"])
+        .add("clean_jd", clean_jd, ["job_description"])
+        .add("jd_skills", jd_skills, ["clean_jd"])
+        .add("resume_skills", resume_skills, ["clean_resume"])
+        .add("missing_skills", missing_skills, ["resume_skills", "jd_skills"])
+    )
+
+
+async def run_skills_gap(content: bytes, filename: str, job_description: str) -> Tuple[dict, PipelineRun]:
+    """
+    Compare resume skills against job description skills.
+    
+    Returns:
+        Tuple of (response data, pipeline run)
+    """
+    run = await build_skills_gap_graph().run(
+        content=content,
+        filename=filename,
+        job_description=job_description
+    )
+    resume_skills = run.results["resume_skills"]
+    jd_skills = run.results["jd_skills"]
+    
+    data = {
+        "required_skills": jd_skills,
+        "present_skills": resume_skills,
+        "missing_skills": run.results["missing_skills"],
+        "match_percentage": round(
+            (len(resume_skills) / max(len(jd_skills), 1)) * 100, 1
+        )
+    }
+    return data, run
+
+
+async def analyze_job(payload: dict) -> Tuple[dict, Optional[dict]]:
+    """Job queue handler for analysis jobs."""
+    data, run = await run_analysis(payload["content"], payload["filename"], payload["job_description"])
+    return data, run.report() if run else None
+
+
+async def skills_gap_job(payload: dict) -> Tuple[dict, Optional[dict]]:
+    """Job queue handler for skills-gap jobs."""
+    data, run = await run_skills_gap(payload["content"], payload["filename"], payload["job_description"])
+    return data, run.report()
+
 
 @app.get("/")
 async def root():
@@ -80,17 +438,41 @@ async def root():
 async def health_check():
     """Detailed health check."""
     return {
-        "status": "healthy",
+        "status": "healthy" if readiness and readiness.is_ready() else "starting",
         "services": {
             "embedder": embedder is not None,
             "scorer": scorer is not None,
             "llm_reasoner": llm_reasoner is not None,
             "skill_extractor": skill_extractor is not None
-        }
+        },
+        "readiness": readiness.report() if readiness else None,
+        "result_cache": result_cache.stats() if result_cache else None,
+        "embedding_cache": embedder.cache_stats() if embedder else None,
+        "executor": executor.stats() if executor else None,
+        "parse_sandbox": document_parser.stats() if isinstance(document_parser, ParseSandbox) else None,
+        "job_queue": await job_queue.stats() if job_queue else None
     }
 
 
-@app.post("/analyze")
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness probe: every component has loaded.
+    
+    Returns 503 with per-component state and load durations until then, so
+    load balancers only route to warm replicas.
+    """
+    report = readiness.report() if readiness else {"ready": False, "components": {}}
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+
+@app.post("/analyze", dependencies=[Depends(require_models)])
 async def analyze_resume(
     resume: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
     job_description: str = Form(..., description="Job description text")
@@ -105,68 +487,204 @@ async def analyze_resume(
     - Missing skills
     - Personalized learning roadmap
     """
-    # Validate file type
-    allowed_extensions = [".pdf", ".docx", ".doc"]
-    file_ext = os.path.splitext(resume.filename)[1].lower()
+    try:
+        content = await read_resume_upload(resume)
+        data, run = await run_analysis(content, resume.filename, job_description)
+        
+        headers = {"Server-Timing": run.server_timing()} if run else None
+        return JSONResponse(content={"success": True, "data": data}, headers=headers)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+# Sections of the streamed analysis, in delivery order
+STREAM_SECTIONS = ["scores", "skills", "rejection_reasons", "learning_roadmap", "done"]
+
+
+def emit_cached_analysis(stream: OrderedEventStream, data: dict) -> None:
+    """Replay a cached /analyze result as stream events."""
+    stream.emit("scores", "scores", {"score": data["score"], "sub_scores": data["sub_scores"]})
+    stream.emit("skills", "skills", {
+        "missing_skills": data["missing_skills"],
+        "present_skills": data["present_skills"],
+        "required_skills": data["required_skills"]
+    })
+    stream.emit("rejection_reasons", "rejection_reasons", data["rejection_reasons"])
+    stream.emit("learning_roadmap", "learning_roadmap", data["learning_roadmap"])
+    stream.emit("done", "done", {"cached": True})
+    for section in STREAM_SECTIONS:
+        stream.close(section)
+
+
+@app.post("/analyze/stream", dependencies=[Depends(require_models)])
+async def analyze_resume_stream(
+    resume: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    job_description: str = Form(..., description="Job description text"),
+    format: str = Query("sse", description="Stream format: 'sse' or 'ndjson'")
+):
+    """
+    Streaming variant of /analyze.
+    
+    Emits events in this order, each as soon as it is available:
+    - scores: overall score and sub-scores
+    - skills: missing, present and required skills
+    - rejection_reasons_token / rejection_reasons: streamed LLM tokens, then the parsed reasons
+    - learning_roadmap_token / learning_roadmap: streamed LLM tokens, then the parsed roadmap
+    - done: stage timings
+    
+    Tokens are only sent when an LLM provider is configured. Failures after
+    the stream has started are reported as a final "error" event.
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'")
+    
+    content = await read_resume_upload(resume)
+    cleaner = TextCleaner()
+    clean_jd = await executor.run("clean", cleaner.clean, job_description)
+    cache_key = analysis_cache_key(content, clean_jd)
+    
+    stream = OrderedEventStream(STREAM_SECTIONS)
+    encode = format_sse if format == "sse" else format_ndjson
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        emit_cached_analysis(stream, cached)
+        producer = None
+    else:
+        results = {}
+        
+        def on_token(stage: str, token: str) -> None:
+            stream.emit(stage, f"{stage}_token", token)
+        
+        async def on_complete(stage: str, result) -> None:
+            results[stage] = result
+            if stage == "score_result":
+                stream.emit("scores", "scores", {
+                    "score": result["overall_score"],
+                    "sub_scores": {
+                        "skills_match": result["skills_match"],
+                        "experience_relevance": result["experience_relevance"],
+                        "keyword_coverage": result["keyword_coverage"],
+                        "role_alignment": result["role_alignment"]
+                    }
+                })
+                stream.close("scores")
+            elif stage == "missing_skills":
+                stream.emit("skills", "skills", {
+                    "missing_skills": result,
+                    "present_skills": results["resume_skills"],
+                    "required_skills": results["jd_skills"]
+                })
+                stream.close("skills")
+            elif stage in ("rejection_reasons", "learning_roadmap"):
+                stream.emit(stage, stage, result)
+                stream.close(stage)
+        
+        async def produce() -> None:
+            degraded = []
+            try:
+                run = await build_analysis_graph(on_token, degraded.append).run(
+                    on_complete=on_complete,
+                    content=content,
+                    filename=resume.filename,
+                    clean_jd=clean_jd
+                )
+                if not degraded:
+                    result_cache.set(cache_key, analysis_response_data(run.results))
+                stream.emit("done", "done", run.report())
+                stream.close("done")
+            except HTTPException as e:
+                stream.fail("error", {"status_code": e.status_code, "detail": e.detail})
+            except Exception as e:
+                stream.fail("error", {"status_code": 500, "detail": f"Analysis failed: {str(e)}"})
+        
+        producer = asyncio.create_task(produce())
+    
+    async def body():
+        try:
+            async for event, data in stream:
+                yield encode(event, data)
+        finally:
+            # Client went away or stream finished; stop any remaining stages
+            if producer is not None and not producer.done():
+                producer.cancel()
+    
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/analyze/batch", dependencies=[Depends(require_models)])
+async def analyze_batch(
+    resumes: List[UploadFile] = File(..., description="Resume files (PDF or DOCX)"),
+    job_description: str = Form(..., description="Job description text")
+):
+    """
+    Screen many resumes against a single job description.
+    
+    The job description is cleaned, skill-extracted and embedded once, and
+    all resume texts are embedded together in large batches. LLM explanations
+    and roadmaps are not generated in batch mode.
     
-    if file_ext not in allowed_extensions:
+    Returns per-resume scores and skill gaps in upload order.
+    """
+    max_files = int(os.getenv("BATCH_MAX_FILES", 500))
+    if len(resumes) > max_files:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
+            detail=f"Too many files. Maximum per batch: {max_files}"
         )
     
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-            content = await resume.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        # Parse resume
-        parser = ResumeParser()
-        resume_text = parser.extract_text(tmp_path)
-        
-        # Clean texts
         cleaner = TextCleaner()
-        clean_resume = cleaner.clean(resume_text)
-        clean_jd = cleaner.clean(job_description)
-        
-        if not clean_resume.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="Could not extract text from resume. Please ensure the file is not corrupted."
-            )
-        
-        # Calculate scores
-        score_result = scorer.calculate_score(clean_resume, clean_jd)
         
-        # Extract skills
-        jd_skills = skill_extractor.extract_from_jd(clean_jd)
-        resume_skills = skill_extractor.extract_from_resume(clean_resume)
-        missing_skills = skill_extractor.find_missing_skills(resume_skills, jd_skills)
+        # Process the job description once for the whole batch
+        clean_jd = await executor.run("clean", cleaner.clean, job_description)
+        jd_doc = await executor.run("skills", ParsedDocument.parse, clean_jd, "jd", skill_extractor)
+        jd_skills = list(jd_doc.skills)
         
-        # Generate explanations and roadmap using LLM
-        rejection_reasons = []
-        if score_result["overall_score"] < 70:
-            rejection_reasons = await llm_reasoner.explain_rejection(
-                score_result,
-                missing_skills,
-                clean_resume,
-                clean_jd
-            )
+        async def parse_upload(upload: UploadFile) -> dict:
+            item = {"filename": upload.filename}
+            
+            try:
+                content = await read_resume_upload(upload)
+            except HTTPException as e:
+                item["error"] = e.detail
+                return item
+            
+            try:
+                text = await executor.run("parse", document_parser.extract_from_bytes, content, upload.filename)
+                clean_resume = await executor.run("clean", cleaner.clean, text)
+            except Exception as e:
+                item["error"] = f"Could not parse resume: {str(e)}"
+                return item
+            
+            if not clean_resume.strip():
+                item["error"] = "Could not extract text from resume."
+                return item
+            
+            item["doc"] = await executor.run("skills", ParsedDocument.parse, clean_resume, "resume", skill_extractor)
+            return item
         
-        learning_roadmap = await llm_reasoner.generate_roadmap(
-            missing_skills,
-            score_result,
-            clean_jd
-        )
+        # Parse all uploads concurrently on the parse pool
+        results = await asyncio.gather(*(parse_upload(upload) for upload in resumes))
+        scored_indices = [i for i, item in enumerate(results) if "doc" in item]
+        scored_docs = [results[i].pop("doc") for i in scored_indices]
         
-        # Cleanup temp file
-        os.unlink(tmp_path)
+        # Embed every resume in large batches against the single JD embedding
+        score_results = await executor.run("score", scorer.calculate_scores_batch, scored_docs, jd_doc)
         
-        return JSONResponse(content={
-            "success": True,
-            "data": {
+        for i, resume_doc, score_result in zip(scored_indices, scored_docs, score_results):
+            resume_skills = list(resume_doc.skills)
+            missing_skills = skill_extractor.find_missing_skills(resume_skills, jd_skills)
+            
+            results[i].update({
                 "score": score_result["overall_score"],
                 "sub_scores": {
                     "skills_match": score_result["skills_match"],
@@ -174,24 +692,22 @@ async def analyze_resume(
                     "keyword_coverage": score_result["keyword_coverage"],
                     "role_alignment": score_result["role_alignment"]
                 },
-                "rejection_reasons": rejection_reasons,
                 "missing_skills": missing_skills,
-                "present_skills": resume_skills,
+                "present_skills": resume_skills
+            })
+        
+        return JSONResponse(content={
+            "success": True,
+            "data": {
                 "required_skills": jd_skills,
-                "learning_roadmap": learning_roadmap
+                "results": results
             }
         })
         
     except HTTPException:
         raise
     except Exception as e:
-        # Cleanup temp file on error
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
 
 
 @app.post("/extract-text")
@@ -199,90 +715,112 @@ async def extract_text(
     file: UploadFile = File(..., description="Resume file (PDF or DOCX)")
 ):
     """Extract text from a resume file."""
-    allowed_extensions = [".pdf", ".docx", ".doc"]
-    file_ext = os.path.splitext(file.filename)[1].lower()
-    
-    if file_ext not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
-        )
+    content = await read_resume_upload(file)
     
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        parser = ResumeParser()
-        text = parser.extract_text(tmp_path)
+        text = await executor.run("parse", document_parser.extract_from_bytes, content, file.filename)
         
         cleaner = TextCleaner()
-        clean_text = cleaner.clean(text)
-        
-        os.unlink(tmp_path)
+        clean_text = await executor.run("clean", cleaner.clean, text)
         
         return {"success": True, "text": clean_text}
         
     except Exception as e:
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/skills-gap")
+@app.post("/skills-gap", dependencies=[Depends(require_models)])
 async def analyze_skills_gap(
     resume: UploadFile = File(...),
     job_description: str = Form(...)
 ):
     """Analyze skills gap between resume and job description."""
-    allowed_extensions = [".pdf", ".docx", ".doc"]
-    file_ext = os.path.splitext(resume.filename)[1].lower()
-    
-    if file_ext not in allowed_extensions:
-        raise HTTPException(status_code=400, detail="Invalid file type")
+    content = await read_resume_upload(resume)
     
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-            content = await resume.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        parser = ResumeParser()
-        resume_text = parser.extract_text(tmp_path)
-        
-        cleaner = TextCleaner()
-        clean_resume = cleaner.clean(resume_text)
-        clean_jd = cleaner.clean(job_description)
+        data, run = await run_skills_gap(content, resume.filename, job_description)
         
-        jd_skills = skill_extractor.extract_from_jd(clean_jd)
-        resume_skills = skill_extractor.extract_from_resume(clean_resume)
-        missing_skills = skill_extractor.find_missing_skills(resume_skills, jd_skills)
-        
-        os.unlink(tmp_path)
+        return JSONResponse(
+            content={"success": True, "data": data},
+            headers={"Server-Timing": run.server_timing()}
+        )
         
-        return {
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Longest a GET /jobs/{job_id} request may block waiting for a result
+JOB_MAX_WAIT = float(os.getenv("JOB_MAX_WAIT", 30))
+
+
+async def submit_job(kind: str, resume: UploadFile, job_description: str) -> JSONResponse:
+    """Queue a resume job and return its id with a 202."""
+    content = await read_resume_upload(resume)
+    
+    try:
+        job = await job_queue.submit(kind, {
+            "content": content,
+            "filename": resume.filename or "",
+            "job_description": job_description
+        })
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Job queue is full. Please retry shortly.",
+            headers={"Retry-After": "5"}
+        )
+    
+    return JSONResponse(
+        status_code=202,
+        content={
             "success": True,
             "data": {
-                "required_skills": jd_skills,
-                "present_skills": resume_skills,
-                "missing_skills": missing_skills,
-                "match_percentage": round(
-                    (len(resume_skills) / max(len(jd_skills), 1)) * 100, 1
-                )
+                "job_id": job["job_id"],
+                "status": job["status"],
+                "poll_url": f"/jobs/{job['job_id']}"
             }
         }
-        
-    except Exception as e:
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-        raise HTTPException(status_code=500, detail=str(e))
+    )
+
+
+@app.post("/jobs/analyze", dependencies=[Depends(require_models)])
+async def submit_analyze_job(
+    resume: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    job_description: str = Form(..., description="Job description text")
+):
+    """
+    Queue a full analysis (same result as /analyze).
+    
+    Returns a job id immediately; fetch the result from GET /jobs/{job_id}.
+    """
+    return await submit_job("analyze", resume, job_description)
+
+
+@app.post("/jobs/skills-gap", dependencies=[Depends(require_models)])
+async def submit_skills_gap_job(
+    resume: UploadFile = File(...),
+    job_description: str = Form(...)
+):
+    """Queue a skills gap analysis (same result as /skills-gap)."""
+    return await submit_job("skills-gap", resume, job_description)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="Seconds to long-poll for completion")
+):
+    """
+    Fetch a job's status, and its result or error once finished.
+    
+    Status is one of queued, running, succeeded or failed. Pass wait to hold
+    the request open until the job finishes (capped by JOB_MAX_WAIT).
+    """
+    job = await job_queue.get(job_id, wait=min(wait, JOB_MAX_WAIT))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    
+    return {"success": True, "data": job}
 
 
 @app.post("/roadmap")
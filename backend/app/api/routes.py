@@ -18,6 +18,8 @@ from app.services.analyzer_service import AnalyzerService
 from app.services.skills_service import SkillsService
 from app.services.market_service import MarketService
 from app.services.report_service import ReportService
+from app.core.config import settings
+from utils.uploads import read_upload
 
 router = APIRouter()
 
@@ -45,14 +47,8 @@ async def analyze_resume(
             detail="Invalid file type. Please upload PDF or DOCX."
         )
     
-    # Read file content
-    content = await file.read()
-    
-    if len(content) > 10 * 1024 * 1024:  # 10MB limit
-        raise HTTPException(
-            status_code=400,
-            detail="File too large. Maximum size is 10MB."
-        )
+    # Read file content within the size cap
+    content = await read_upload(file, settings.MAX_FILE_SIZE)
     
     # Get analyzer from app state
     analyzer = getattr(request.app.state, 'analyzer', None)
@@ -80,7 +76,7 @@ async def analyze_skills_gap(
         raise HTTPException(status_code=400, detail="No file provided")
     
     extension = "." + file.filename.split(".")[-1].lower()
-    content = await file.read()
+    content = await read_upload(file, settings.MAX_FILE_SIZE)
     
     analyzer = getattr(request.app.state, 'analyzer', None)
     service = SkillsService(analyzer)
@@ -144,7 +140,7 @@ async def generate_cover_letter(
         raise HTTPException(status_code=400, detail="No file provided")
     
     extension = "." + file.filename.split(".")[-1].lower()
-    content = await file.read()
+    content = await read_upload(file, settings.MAX_FILE_SIZE)
     
     analyzer = getattr(request.app.state, 'analyzer', None)
     service = AnalyzerService(analyzer)
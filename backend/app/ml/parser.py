@@ -3,17 +3,31 @@ Resume Parser Module
 Extracts text from PDF and DOCX files
 """
 
+import os
 import re
 from io import BytesIO
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from services.pdf_backends import backend_chain, text_quality
+
 
 class ResumeParser:
     """Parser for extracting text and structure from resume files"""
     
+    # The raw-decode fallback only looks at this much of an unparseable file
+    BASIC_EXTRACTION_MAX_BYTES = 256 * 1024
+    # ...and gives up when less than this fraction of it decodes to readable text
+    BASIC_EXTRACTION_MIN_TEXT_RATIO = 0.8
+    
     def __init__(self):
         self.supported_formats = [".pdf", ".docx", ".doc", ".txt"]
+        fallbacks = os.getenv("PDF_FALLBACK_BACKENDS")
+        self.pdf_backends = backend_chain(
+            os.getenv("PDF_BACKEND", "auto"),
+            [name.strip().lower() for name in fallbacks.split(",") if name.strip()] if fallbacks is not None else None
+        )
+        self.min_text_quality = float(os.getenv("PDF_MIN_TEXT_QUALITY", 0.5))
     
     def parse(self, file_content: bytes, filename: str) -> Dict:
         """
@@ -37,28 +51,44 @@ class ResumeParser:
         else:
             raise ValueError(f"Unsupported file format: {ext}")
         
+        # Sectioned once; experience and education entries reuse the result
+        sections = self._extract_sections(text)
+        
         return {
             "raw_text": text,
-            "sections": self._extract_sections(text),
+            "sections": sections,
             "contact": self._extract_contact(text),
             "skills": self._extract_skills(text),
-            "experience": self._extract_experience(text),
-            "education": self._extract_education(text),
+            "experience": self._extract_experience(sections),
+            "education": self._extract_education(sections),
         }
     
     def _parse_pdf(self, content: bytes) -> str:
-        """Extract text from PDF file"""
-        try:
-            import PyPDF2
-            
-            reader = PyPDF2.PdfReader(BytesIO(content))
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
-        except Exception as e:
-            # Fallback for when PyPDF2 fails
-            return self._basic_text_extraction(content)
+        """
+        Extract text from PDF file with the configured backend chain
+        (PDF_BACKEND, PDF_FALLBACK_BACKENDS; see services.pdf_backends)
+        """
+        best_text, best_quality = "", -1.0
+        parsed = False
+        for backend in self.pdf_backends:
+            try:
+                pages = backend.extract_range(content, 0, backend.page_count(content))
+            except Exception:
+                # This backend can't read the file; try the next one
+                continue
+            parsed = True
+            text = "\n".join(pages).strip()
+            if not text:
+                continue
+            quality = text_quality(text)
+            if quality >= self.min_text_quality:
+                return text
+            # Garbled text (broken font encoding): keep the best and try the next backend
+            if quality > best_quality:
+                best_text, best_quality = text, quality
+        
+        # Fallback for when every backend fails
+        return best_text if parsed else self._basic_text_extraction(content)
     
     def _parse_docx(self, content: bytes) -> str:
         """Extract text from DOCX file"""
@@ -72,11 +102,15 @@ class ResumeParser:
             return self._basic_text_extraction(content)
     
     def _basic_text_extraction(self, content: bytes) -> str:
-        """Basic text extraction fallback"""
-        try:
-            return content.decode("utf-8", errors="ignore")
-        except:
+        """Basic text extraction fallback for files no parser could read"""
+        text = content[:self.BASIC_EXTRACTION_MAX_BYTES].decode("utf-8", errors="replace")
+        
+        # Binary (compressed streams, images) decodes mostly to replacement
+        # and control characters; that is not resume text
+        readable = sum(1 for char in text if char != "\ufffd" and (char.isprintable() or char in "\n\r\t"))
+        if not text or readable < len(text) * self.BASIC_EXTRACTION_MIN_TEXT_RATIO:
             return ""
+        return text.replace("\ufffd", "")
     
     def _extract_sections(self, text: str) -> Dict[str, str]:
         """Extract resume sections based on common headers"""
@@ -170,13 +204,13 @@ class ResumeParser:
         
         return list(skills)
     
-    def _extract_experience(self, text: str) -> List[Dict]:
-        """Extract work experience entries"""
+    def _extract_experience(self, sections: Dict[str, str]) -> List[Dict]:
+        """Extract work experience entries from the parsed sections"""
         experience = []
         
         # Look for common experience patterns
         # This is a simplified extraction - production would use more sophisticated NLP
-        experience_section = self._extract_sections(text).get("experience", "")
+        experience_section = sections.get("experience", "")
         
         if experience_section:
             # Split by common delimiters (dates, bullet points, etc.)
@@ -191,11 +225,11 @@ class ResumeParser:
         
         return experience
     
-    def _extract_education(self, text: str) -> List[Dict]:
-        """Extract education entries"""
+    def _extract_education(self, sections: Dict[str, str]) -> List[Dict]:
+        """Extract education entries from the parsed sections"""
         education = []
         
-        education_section = self._extract_sections(text).get("education", "")
+        education_section = sections.get("education", "")
         
         # Look for degree patterns
         degree_patterns = [
@@ -37,14 +37,14 @@ class AnalyzerService:
         """
         Analyze a resume and return comprehensive feedback.
         """
-        # Parse resume text
-        text = self.parser.parse(content, extension)
+        # Parse once: text and sections come from the same pass
+        parsed = self.parser.parse(content, f"resume{extension}")
+        text = parsed["raw_text"]
         
         if not text or len(text.strip()) < 50:
             return self._get_error_response("Could not extract text from resume")
         
-        # Extract sections
-        sections = self.parser.extract_sections(text)
+        sections = parsed["sections"]
         
         # Get required keywords for role
         required_keywords = ROLE_KEYWORDS.get(job_role, ROLE_KEYWORDS["sde"])
@@ -420,7 +420,7 @@ class AnalyzerService:
         company_name: str
     ) -> str:
         """Generate a personalized cover letter"""
-        text = self.parser.parse(content, extension)
+        text = self.parser.parse(content, f"resume{extension}")["raw_text"]
         skills = self.keyword_extractor.extract_skills(text)
         
         # Basic template-based generation (can be enhanced with LLM)
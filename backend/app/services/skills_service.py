@@ -132,7 +132,7 @@ class SkillsService:
         """Analyze skills gap and generate roadmap"""
         
         # Parse resume
-        text = self.parser.parse(content, extension)
+        text = self.parser.parse(content, f"resume{extension}")["raw_text"]
         
         # Extract current skills
         current_skills = self.keyword_extractor.extract_skills(text)
@@ -0,0 +1,205 @@
+"""
+Embedder Backend Comparison
+Measures latency, throughput and drift of each EMBEDDING_BACKEND against torch.
+
+Usage (from backend/):
+    python -m benchmarks.embedder_backends
+    python -m benchmarks.embedder_backends --backends torch onnx-int8 --texts 1000 --output report.json
+
+Reports, per backend:
+    - model load time
+    - single-text latency (p50 / p95)
+    - batch throughput (texts per second)
+    - cosine similarity of each vector to the torch vector (mean / min)
+    - absolute drift of ResumeScorer scores versus torch (mean / max)
+
+Results depend on the CPU, thread count and model; run on the target
+instance type before choosing a backend.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.embedder import EMBEDDING_BACKENDS, Embedder  # noqa: E402
+from services.scorer import ResumeScorer  # noqa: E402
+from utils.skill_extractor import SkillExtractor  # noqa: E402
+
+
+SENTENCES = [
+    "{years} years of experience building {a} services with {b} and {c}.",
+    "Led a team of {n} engineers delivering {a} and {b} projects.",
+    "Designed and deployed {a} pipelines on {b}, reducing costs by {n}%.",
+    "Strong background in {a}, {b} and {c}.",
+    "We are looking for an engineer with hands-on {a} and {b} experience.",
+    "Requirements: {a}, {b}, {c}. Nice to have: {d}.",
+]
+
+
+def build_corpus(count: int, seed: int = 7) -> List[str]:
+    """Generate resume- and JD-like sentences from the skill taxonomy."""
+    rng = random.Random(seed)
+    skills = sorted(SkillExtractor().all_skills)
+    corpus = []
+    for _ in range(count):
+        picked = rng.sample(skills, 4)
+        template = rng.choice(SENTENCES)
+        text = template.format(
+            a=picked[0], b=picked[1], c=picked[2], d=picked[3],
+            years=rng.randint(1, 12), n=rng.randint(2, 40)
+        )
+        # Mix in some paragraph-length texts, like real resume sections
+        if rng.random() < 0.2:
+            text = " ".join([text] + [rng.choice(SENTENCES).format(
+                a=rng.choice(skills), b=rng.choice(skills), c=rng.choice(skills),
+                d=rng.choice(skills), years=rng.randint(1, 12), n=rng.randint(2, 40)
+            ) for _ in range(rng.randint(3, 8))])
+        corpus.append(text)
+    return corpus
+
+
+def build_pairs(corpus: List[str], count: int, seed: int = 11) -> List[Tuple[str, str]]:
+    """Assemble (resume, job description) pairs for score drift."""
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(count):
+        resume = "Experience\n" + "\n".join(rng.sample(corpus, 6)) + "\nSkills\n" + ", ".join(rng.sample(corpus, 2))
+        jd = "Job Description\n" + " ".join(rng.sample(corpus, 3)) + "\nRequirements\n" + " ".join(rng.sample(corpus, 2))
+        pairs.append((resume, jd))
+    return pairs
+
+
+def load_embedder(model: str, backend: str) -> Tuple[Embedder, float]:
+    """Load an uncached embedder for one backend and return it with its load time."""
+    os.environ["EMBEDDING_BACKEND"] = backend
+    os.environ["EMBEDDING_CACHE_BYTES"] = "0"
+    start = time.perf_counter()
+    embedder = Embedder(model)
+    return embedder, time.perf_counter() - start
+
+
+def measure(
+    embedder: Embedder,
+    corpus: List[str],
+    batch_size: int,
+    repeats: int
+) -> Tuple[Dict[str, float], np.ndarray]:
+    """Time single-text and batch encoding; return metrics and the batch vectors."""
+    # Warm up kernels and allocator
+    embedder.embed_batch(corpus[:batch_size], batch_size=batch_size)
+
+    latencies = []
+    for text in corpus[:repeats]:
+        start = time.perf_counter()
+        embedder.embed(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    vectors = embedder.embed_batch(corpus, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "throughput_texts_per_s": round(len(corpus) / elapsed, 1),
+    }, vectors
+
+
+def cosine_drift(vectors: np.ndarray, reference: np.ndarray) -> Dict[str, float]:
+    """Row-wise cosine similarity between two embedding matrices."""
+    a = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    b = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cosine = np.sum(a * b, axis=1)
+    return {
+        "cosine_to_torch_mean": round(float(cosine.mean()), 6),
+        "cosine_to_torch_min": round(float(cosine.min()), 6),
+    }
+
+
+def score_drift(scores: List[float], reference: List[float]) -> Dict[str, float]:
+    """Absolute difference of overall scores (0-100 scale)."""
+    diff = np.abs(np.array(scores) - np.array(reference))
+    return {
+        "score_drift_mean": round(float(diff.mean()), 3),
+        "score_drift_max": round(float(diff.max()), 3),
+    }
+
+
+def format_table(rows: List[Dict]) -> str:
+    """Render results as a Markdown table."""
+    columns = [
+        "backend", "load_s", "latency_p50_ms", "latency_p95_ms", "throughput_texts_per_s",
+        "cosine_to_torch_mean", "cosine_to_torch_min", "score_drift_mean", "score_drift_max"
+    ]
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "|" + "---|" * len(columns),
+    ]
+    for row in rows:
+        lines.append("| " + " | ".join(str(row.get(column, "-")) for column in columns) + " |")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"))
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--texts", type=int, default=512, help="Corpus size for the throughput run")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=100, help="Single-text calls for latency")
+    parser.add_argument("--pairs", type=int, default=25, help="Resume/JD pairs for score drift")
+    parser.add_argument("--output", help="Optional path for a JSON report")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.texts)
+    pairs = build_pairs(corpus, args.pairs)
+    backends = ["torch"] + [backend for backend in args.backends if backend != "torch"]
+
+    reference_vectors = None
+    reference_scores = None
+    rows = []
+
+    for backend in backends:
+        embedder, load_s = load_embedder(args.model, backend)
+        if embedder.backend != backend:
+            print(f"Skipping {backend}: fell back to {embedder.backend}")
+            continue
+
+        metrics, vectors = measure(embedder, corpus, args.batch_size, args.repeats)
+        scorer = ResumeScorer(embedder)
+        scores = [scorer.calculate_score(resume, jd)["overall_score"] for resume, jd in pairs]
+
+        row = {"backend": backend, "load_s": round(load_s, 2), **metrics}
+        if reference_vectors is None:
+            reference_vectors, reference_scores = vectors, scores
+        row.update(cosine_drift(vectors, reference_vectors))
+        row.update(score_drift(scores, reference_scores))
+        rows.append(row)
+        print(f"{backend}: done")
+
+    print()
+    print(f"Model: {args.model}  texts: {len(corpus)}  batch size: {args.batch_size}  "
+          f"threads: {os.cpu_count()}")
+    print(format_table(rows))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "model": args.model,
+                "texts": len(corpus),
+                "batch_size": args.batch_size,
+                "cpu_count": os.cpu_count(),
+                "results": rows
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+FAISS ANN Recall Benchmark
+Measures recall@k and query latency of HNSW and IVF against the flat index.
+
+Usage (from backend/):
+    python -m benchmarks.faiss_ann_recall
+    python -m benchmarks.faiss_ann_recall --docs 1000000 --queries 1000 --k 10
+
+Vectors are synthetic and clustered (a mixture of Gaussians on the unit
+sphere) so recall behaves like real embeddings rather than uniform noise.
+Pass --vectors with a .npy file of real embeddings for representative numbers.
+"""
+
+import os
+import sys
+import time
+import argparse
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.faiss_index import FAISS_AVAILABLE, FAISSIndex  # noqa: E402
+
+
+def synthetic_vectors(centers: np.ndarray, count: int, spread: float, seed: int) -> np.ndarray:
+    """Unit vectors scattered around randomly chosen cluster centers."""
+    rng = np.random.default_rng(seed)
+    assignment = rng.integers(0, len(centers), count)
+    noise = rng.standard_normal((count, centers.shape[1])).astype(np.float32)
+    vectors = centers[assignment] + spread * noise
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build(index_type: str, vectors: np.ndarray, args) -> Dict:
+    """Build one index and return it with its build time."""
+    index = FAISSIndex(
+        embedding_dim=vectors.shape[1],
+        index_type=index_type,
+        hnsw_m=args.hnsw_m,
+        nlist=args.nlist
+    )
+    documents = [""] * len(vectors)
+
+    start = time.perf_counter()
+    if index_type == "ivf":
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), 40 * args.nlist), replace=False)]
+        index.train(sample)
+    for offset in range(0, len(vectors), 100_000):
+        index.add(vectors[offset:offset + 100_000], documents[offset:offset + 100_000])
+    return {"index": index, "build_s": time.perf_counter() - start}
+
+
+def run_queries(index: FAISSIndex, queries: np.ndarray, k: int) -> Dict:
+    """Search one query at a time; return ids and mean latency."""
+    ids = np.full((len(queries), k), -1, dtype=np.int64)
+    start = time.perf_counter()
+    for row, query in enumerate(queries):
+        found = [result[0] for result in index.search(query, top_k=k, threshold=-1.0)]
+        ids[row, :len(found)] = found
+    elapsed = time.perf_counter() - start
+    return {"ids": ids, "latency_ms": 1000 * elapsed / len(queries)}
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """Fraction of true top-k neighbours returned."""
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found.tolist(), truth.tolist()))
+    return hits / truth.size
+
+
+def format_table(rows: List[Dict]) -> str:
+    """Render results as a Markdown table."""
+    columns = ["index", "param", "recall_at_k", "latency_ms", "speedup", "build_s"]
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    for row in rows:
+        lines.append("| " + " | ".join(str(row.get(column, "-")) for column in columns) + " |")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--spread", type=float, default=1.0, help="Within-cluster noise relative to center scale")
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64, 128])
+    parser.add_argument("--vectors", help="Optional .npy file of real embeddings to index")
+    args = parser.parse_args()
+
+    if not FAISS_AVAILABLE:
+        sys.exit("FAISS is not installed; ANN index types need faiss-cpu.")
+
+    if args.vectors:
+        vectors = np.load(args.vectors).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        rng = np.random.default_rng(1)
+        picks = rng.choice(len(vectors), args.queries, replace=False)
+        queries = vectors[picks] + 0.05 * rng.standard_normal((args.queries, vectors.shape[1])).astype(np.float32)
+    else:
+        centers = np.random.default_rng(0).standard_normal((args.clusters, args.dim)).astype(np.float32)
+        vectors = synthetic_vectors(centers, args.docs, args.spread, seed=1)
+        queries = synthetic_vectors(centers, args.queries, args.spread, seed=2)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    print(f"docs={len(vectors)} dim={vectors.shape[1]} queries={len(queries)} k={args.k}")
+
+    flat = build("flat", vectors, args)
+    exact = run_queries(flat["index"], queries, args.k)
+    rows = [{
+        "index": "flat",
+        "param": "-",
+        "recall_at_k": 1.0,
+        "latency_ms": round(exact["latency_ms"], 3),
+        "speedup": 1.0,
+        "build_s": round(flat["build_s"], 2)
+    }]
+
+    for index_type, knob, values in (("hnsw", "ef_search", args.ef_search), ("ivf", "nprobe", args.nprobe)):
+        built = build(index_type, vectors, args)
+        for value in values:
+            built["index"].set_search_params(**{knob: value})
+            result = run_queries(built["index"], queries, args.k)
+            rows.append({
+                "index": index_type,
+                "param": f"{knob}={value}",
+                "recall_at_k": round(recall_at_k(result["ids"], exact["ids"]), 4),
+                "latency_ms": round(result["latency_ms"], 3),
+                "speedup": round(exact["latency_ms"] / result["latency_ms"], 1),
+                "build_s": round(built["build_s"], 2)
+            })
+
+    print(format_table(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ import logging
 
 from app.api.routes import router as api_router
 from app.core.config import settings
+from utils.uploads import FORM_OVERHEAD_BYTES, MaxBodySizeMiddleware, keep_uploads_in_memory
 from app.ml.analyzer import ResumeAnalyzer
 
 # Configure logging
@@ -62,6 +63,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Keep capped uploads off disk while the multipart body is parsed
+keep_uploads_in_memory(settings.MAX_FILE_SIZE)
+
+# Reject oversized request bodies while they stream in
+app.add_middleware(
+    MaxBodySizeMiddleware,
+    max_bytes=settings.MAX_FILE_SIZE + FORM_OVERHEAD_BYTES,
+)
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
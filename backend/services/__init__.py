@@ -3,16 +3,29 @@ Backend Services Module
 Exports all service classes for the AI Resume Intelligence System.
 """
 
-from services.resume_parser import ResumeParser
-from services.embedder import Embedder
-from services.faiss_index import FAISSIndex
-from services.scorer import ResumeScorer
-from services.llm_reasoner import LLMReasoner
+import importlib
 
-__all__ = [
-    "ResumeParser",
-    "Embedder", 
-    "FAISSIndex",
-    "ResumeScorer",
-    "LLMReasoner"
-]
+# Exports are imported on first access, so a process that only needs one
+# service (e.g. a parse sandbox worker) doesn't load the embedding model stack
+_EXPORTS = {
+    "ResumeParser": "services.resume_parser",
+    "Embedder": "services.embedder",
+    "FAISSIndex": "services.faiss_index",
+    "ResumeScorer": "services.scorer",
+    "LLMReasoner": "services.llm_reasoner",
+    "ResultCache": "services.result_cache",
+    "StageExecutor": "services.executor",
+    "StageGraph": "services.pipeline",
+    "OrderedEventStream": "services.streaming",
+    "JobQueue": "services.job_queue",
+    "ReadinessTracker": "services.readiness",
+    "ParseSandbox": "services.parse_sandbox"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'services' has no attribute '{name}'")
@@ -4,11 +4,368 @@ Handles semantic embeddings using Sentence Transformers.
 """
 
 import os
-from typing import List, Union, Optional
+import re
+import sys
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Union, Optional
 import numpy as np
 
 from sentence_transformers import SentenceTransformer
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import onnxruntime
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+# Inference backends selectable with EMBEDDING_BACKEND
+EMBEDDING_BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2 normalize rows as float32; zero rows stay zero (similarity 0)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class _DiskEmbeddingStore:
+    """
+    Append-only on-disk embedding store.
+    Vectors live in a raw float32 file that is memory-mapped for reads, and a
+    text index maps each key to its row. Survives restarts and can be shared
+    by several workers on the same host.
+    """
+    
+    def __init__(self, cache_dir: str, namespace: str, dim: int):
+        os.makedirs(cache_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", namespace)
+        self.vectors_path = os.path.join(cache_dir, f"{slug}.f32")
+        self.keys_path = os.path.join(cache_dir, f"{slug}.keys")
+        self.dim = dim
+        self.row_bytes = dim * np.dtype(np.float32).itemsize
+        self.rows: Dict[str, int] = {}
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._load_index()
+    
+    def _load_index(self) -> None:
+        """Read the key index, ignoring rows whose vector was never fully written."""
+        if not os.path.exists(self.keys_path):
+            return
+        
+        n_rows = os.path.getsize(self.vectors_path) // self.row_bytes if os.path.exists(self.vectors_path) else 0
+        with open(self.keys_path, "r", encoding="ascii") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1].isdigit() and int(parts[1]) < n_rows:
+                    self.rows[parts[0]] = int(parts[1])
+    
+    def _vectors(self, row: int) -> Optional[np.memmap]:
+        """Return a memory map covering at least the given row."""
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            n_rows = os.path.getsize(self.vectors_path) // self.row_bytes
+            if row >= n_rows:
+                return None
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n_rows, self.dim))
+        return self._mmap
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up a vector, copying it out of the memory map."""
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        
+        with self._lock:
+            vectors = self._vectors(row)
+            return None if vectors is None else np.array(vectors[row])
+    
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Append a vector unless the key is already stored."""
+        if key in self.rows:
+            return
+        
+        data = np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+        with self._lock, open(self.vectors_path, "ab") as vec_file:
+            if fcntl is not None:
+                fcntl.flock(vec_file, fcntl.LOCK_EX)
+            try:
+                # Row is derived from the file size under the lock, so
+                # concurrent writers from other processes can't collide
+                vec_file.seek(0, os.SEEK_END)
+                row = vec_file.tell() // self.row_bytes
+                vec_file.write(data)
+                vec_file.flush()
+                with open(self.keys_path, "a", encoding="ascii") as keys_file:
+                    keys_file.write(f"{key} {row}\n")
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(vec_file, fcntl.LOCK_UN)
+        self.rows[key] = row
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class EmbeddingCache:
+    """
+    Embedding cache keyed by model name and text hash.
+    The in-memory LRU tier is bounded by a byte budget rather than an entry
+    count, and an optional memory-mapped disk tier persists across restarts.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        max_bytes: int = 64 * 1024 * 1024,
+        cache_dir: Optional[str] = None
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            model_name: Embedding model name, part of every key
+            dim: Embedding dimension
+            max_bytes: Memory budget for the in-memory tier
+            cache_dir: Directory for the persistent tier. Disabled when empty.
+        """
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskEmbeddingStore(cache_dir, model_name, dim) if cache_dir else None
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def key(self, text: str) -> str:
+        """Return the cache key for a text."""
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Look up a vector in memory, then on disk."""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+        
+        vector = self._disk.get(key) if self._disk is not None else None
+        
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._put_memory(key, vector)
+        return vector
+    
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Store a vector in both tiers."""
+        vector = np.array(vector, dtype=np.float32)
+        with self._lock:
+            self._put_memory(key, vector)
+        if self._disk is not None:
+            self._disk.put(key, vector)
+    
+    def _put_memory(self, key: str, vector: np.ndarray) -> None:
+        """Insert into the LRU tier and evict until under budget. Caller holds the lock."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        
+        size = self._entry_size(key, vector)
+        if size > self.max_bytes:
+            return
+        
+        self._memory[key] = vector
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            old_key, old_vector = self._memory.popitem(last=False)
+            self.current_bytes -= self._entry_size(old_key, old_vector)
+    
+    @staticmethod
+    def _entry_size(key: str, vector: np.ndarray) -> int:
+        """Approximate memory held by one entry."""
+        return vector.nbytes + sys.getsizeof(key)
+    
+    def stats(self) -> Dict:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_entries": len(self._disk) if self._disk is not None else 0
+            }
+
+
+class _OnnxEncoder:
+    """
+    Runs an exported ONNX copy of a SentenceTransformer's transformer module.
+    Mean pooling and normalization are re-applied in numpy, so vectors match
+    the PyTorch path up to floating point (or quantization) error. Exposes the
+    subset of the SentenceTransformer API that Embedder uses.
+    """
+    
+    def __init__(self, model: SentenceTransformer, onnx_path: str, quantize: bool = False):
+        """
+        Args:
+            model: Loaded SentenceTransformer; exported on first use
+            onnx_path: Location of the exported model
+            quantize: Use a dynamically quantized int8 copy of the export
+        """
+        # Only the transformer is exported; anything after pooling other than
+        # Normalize (Dense, LayerNorm, WordWeights, ...) would be silently skipped
+        modules = [type(module).__name__ for module in model]
+        if modules not in (["Transformer", "Pooling"], ["Transformer", "Pooling", "Normalize"]):
+            raise ValueError(f"The ONNX backend only supports Transformer, Pooling[, Normalize] models, not {modules}")
+        if not self._is_mean_pooling(model[1]):
+            raise ValueError("The ONNX backend only supports mean-pooling models")
+        
+        self.tokenizer = model.tokenizer
+        self.max_seq_length = model.max_seq_length
+        self.dim = model.get_sentence_embedding_dimension()
+        self.normalize = modules[-1] == "Normalize"
+        
+        if not os.path.exists(onnx_path):
+            self._export(model[0].auto_model, onnx_path)
+        
+        if quantize:
+            quantized_path = onnx_path[:-len(".onnx")] + ".int8.onnx"
+            if not os.path.exists(quantized_path):
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                tmp_path = f"{quantized_path}.{os.getpid()}.tmp"
+                quantize_dynamic(onnx_path, tmp_path, weight_type=QuantType.QInt8)
+                os.replace(tmp_path, quantized_path)
+            onnx_path = quantized_path
+        
+        options = onnxruntime.SessionOptions()
+        threads = int(os.getenv("EMBEDDING_ONNX_THREADS", 0))
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            onnx_path,
+            options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [node.name for node in self.session.get_inputs()]
+    
+    @staticmethod
+    def _is_mean_pooling(module) -> bool:
+        """Check that a pooling module averages token embeddings and nothing else."""
+        if not hasattr(module, "get_config_dict"):
+            return False
+        config = module.get_config_dict()
+        if "pooling_mode" in config:
+            return config["pooling_mode"] == "mean"
+        # Older sentence-transformers: one boolean flag per pooling mode
+        modes = {key for key, value in config.items() if key.startswith("pooling_mode_") and value}
+        return modes == {"pooling_mode_mean_tokens"}
+    
+    def _export(self, auto_model, onnx_path: str) -> None:
+        """Export the transformer with dynamic batch and sequence axes."""
+        import torch
+        
+        os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+        sample = self.tokenizer(["export sample"], padding=True, return_tensors="pt")
+        input_names = [
+            name for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in sample
+        ]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        
+        class TokenEmbeddings(torch.nn.Module):
+            """Pass inputs by name; positional order differs across transformers versions."""
+            
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+            
+            def forward(self, *inputs):
+                return self.model(**dict(zip(input_names, inputs)), return_dict=True).last_hidden_state
+        
+        export_options = {}
+        # Newer torch defaults to the dynamo exporter; older versions lack the keyword
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            export_options["dynamo"] = False
+        
+        tmp_path = f"{onnx_path}.{os.getpid()}.tmp"
+        auto_model.eval()
+        with torch.no_grad():
+            torch.onnx.export(
+                TokenEmbeddings(auto_model),
+                tuple(sample[name] for name in input_names),
+                tmp_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+                **export_options
+            )
+        os.replace(tmp_path, onnx_path)
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+    
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """Embed texts; same contract as SentenceTransformer.encode with numpy output."""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        
+        embeddings = np.empty((len(sentences), self.dim), dtype=np.float32)
+        # Longest first, like SentenceTransformer, so batches pad to similar lengths
+        order = np.argsort([-len(sentence) for sentence in sentences], kind="stable")
+        
+        for start in range(0, len(sentences), batch_size):
+            indices = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [sentences[i] for i in indices],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            if "token_type_ids" in self.input_names and "token_type_ids" not in encoded:
+                encoded["token_type_ids"] = np.zeros_like(encoded["input_ids"])
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+            
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            embeddings[indices] = pooled
+        
+        return embeddings[0] if single else embeddings
+
 
 class Embedder:
     """
@@ -28,8 +385,71 @@ class Embedder:
                        - "paraphrase-multilingual-MiniLM-L12-v2" (multilingual)
         """
         self.model_name = os.getenv("EMBEDDING_MODEL", model_name)
-        self.model = SentenceTransformer(self.model_name)
+        self.backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+        self.model = self._load_model()
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
+        
+        # Identifies model + backend in cache keys; backends differ slightly in output
+        self.model_key = self.model_name if self.backend == "torch" else f"{self.model_name}:{self.backend}"
+        
+        cache_bytes = int(os.getenv("EMBEDDING_CACHE_BYTES", 64 * 1024 * 1024))
+        self.cache = EmbeddingCache(
+            self.model_key,
+            self.embedding_dim,
+            max_bytes=cache_bytes,
+            cache_dir=os.getenv("EMBEDDING_CACHE_DIR") or None
+        ) if cache_bytes > 0 else None
+    
+    def _load_model(self):
+        """
+        Load the model for the configured inference backend.
+        
+        Backends:
+            torch: SentenceTransformer as-is
+            int8: Linear layers dynamically quantized to int8 (PyTorch)
+            onnx: Exported ONNX model on onnxruntime
+            onnx-int8: Dynamically quantized ONNX model on onnxruntime
+        
+        Weights are cached in MODEL_CACHE_DIR when set. ONNX exports are
+        written once to EMBEDDING_ONNX_DIR (default <MODEL_CACHE_DIR>/onnx).
+        Falls back to torch if the requested backend is unavailable.
+        """
+        if self.backend not in EMBEDDING_BACKENDS:
+            print(f"Warning: Unknown EMBEDDING_BACKEND '{self.backend}'. Using torch.")
+            self.backend = "torch"
+        
+        model = SentenceTransformer(
+            self.model_name,
+            device="cpu" if self.backend != "torch" else None,
+            cache_folder=os.getenv("MODEL_CACHE_DIR") or None
+        )
+        
+        if self.backend == "int8":
+            import torch
+            return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        
+        if self.backend in ("onnx", "onnx-int8"):
+            if not ONNX_AVAILABLE:
+                print("Warning: EMBEDDING_BACKEND=onnx requires the 'onnxruntime' package. Using torch.")
+                self.backend = "torch"
+                return model
+            
+            model_cache_dir = os.getenv("MODEL_CACHE_DIR") or os.path.join(
+                os.path.expanduser("~"), ".cache", "resume-intelligence"
+            )
+            onnx_dir = os.getenv("EMBEDDING_ONNX_DIR", os.path.join(model_cache_dir, "onnx"))
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name)
+            try:
+                return _OnnxEncoder(
+                    model,
+                    os.path.join(onnx_dir, f"{slug}.onnx"),
+                    quantize=self.backend == "onnx-int8"
+                )
+            except Exception as e:
+                print(f"Warning: ONNX backend failed to load ({e}). Using torch.")
+                self.backend = "torch"
+        
+        return model
     
     def embed(self, text: Union[str, List[str]]) -> np.ndarray:
         """
@@ -43,8 +463,8 @@ class Embedder:
             (n_texts, embedding_dim) for multiple texts.
         """
         if isinstance(text, str):
-            return self.model.encode(text, convert_to_numpy=True)
-        return self.model.encode(text, convert_to_numpy=True)
+            return self._encode_cached([text])[0]
+        return self._encode_cached(text)
     
     def embed_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         """
@@ -57,12 +477,53 @@ class Embedder:
         Returns:
             Numpy array of embeddings, shape (n_texts, embedding_dim)
         """
-        return self.model.encode(
-            texts,
-            batch_size=batch_size,
-            convert_to_numpy=True,
-            show_progress_bar=False
-        )
+        return self._encode_cached(texts, batch_size=batch_size)
+    
+    def _encode_cached(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Encode texts, serving repeats from the embedding cache.
+        
+        Only distinct cache misses are sent to the model, in a single call.
+        """
+        if self.cache is None:
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        
+        vectors: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        
+        for text in texts:
+            if text in vectors or text in missing:
+                continue
+            key = self.cache.key(text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                vectors[text] = cached
+            else:
+                missing[text] = key
+        
+        if missing:
+            encoded = self.model.encode(
+                list(missing),
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            for (text, key), vector in zip(missing.items(), encoded):
+                self.cache.put(key, vector)
+                vectors[text] = vector
+        
+        if not texts:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        return np.stack([vectors[text] for text in texts])
+    
+    def cache_stats(self) -> Optional[Dict]:
+        """Return embedding cache counters, or None when caching is disabled."""
+        return self.cache.stats() if self.cache is not None else None
     
     def similarity(self, text1: str, text2: str) -> float:
         """
@@ -112,45 +573,86 @@ class Embedder:
     
     def get_similar_chunks(
         self,
-        query: str,
+        query: Union[str, List[str]],
         documents: List[str],
         top_k: int = 5,
-        threshold: float = 0.3
-    ) -> List[tuple]:
+        threshold: float = 0.3,
+        doc_embeddings: Optional[np.ndarray] = None
+    ) -> Union[List[tuple], List[List[tuple]]]:
         """
-        Find most similar document chunks to a query.
+        Find most similar document chunks to one or more queries.
         
         Args:
-            query: Query text
+            query: Query text, or a list of query texts
             documents: List of document chunks
-            top_k: Number of top results to return
+            top_k: Number of top results to return per query
             threshold: Minimum similarity threshold
+            doc_embeddings: Precomputed embeddings of documents, so the same
+                chunk set can be queried repeatedly without re-encoding
             
         Returns:
-            List of (index, similarity_score, document_text) tuples
+            List of (index, similarity_score, document_text) tuples for a
+            single query, or one such list per query for a list of queries
         """
-        query_emb = self.embed(query)
-        doc_embs = self.embed_batch(documents)
+        queries = [query] if isinstance(query, str) else list(query)
+        if doc_embeddings is None:
+            doc_embeddings = self.embed_batch(documents)
+        elif len(doc_embeddings) != len(documents):
+            raise ValueError("Number of doc_embeddings must match number of documents")
+        
+        scores, indices = self.top_k_similar(self.embed_batch(queries), doc_embeddings, top_k)
         
-        # Calculate similarities
-        similarities = [
-            self._cosine_similarity(query_emb, doc_emb)
-            for doc_emb in doc_embs
+        results = [
+            [
+                (idx, score, documents[idx])
+                for score, idx in zip(row_scores, row_indices)
+                if score >= threshold
+            ]
+            for row_scores, row_indices in zip(scores.tolist(), indices.tolist())
         ]
+        return results[0] if isinstance(query, str) else results
+    
+    @staticmethod
+    def top_k_similar(
+        query_embeddings: np.ndarray,
+        doc_embeddings: np.ndarray,
+        top_k: int = 5
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cosine top-k of each query against a document embedding matrix.
         
-        # Get top-k indices
-        sorted_indices = np.argsort(similarities)[::-1][:top_k]
+        One normalized matrix product followed by partial selection, so only
+        the top_k candidates of each row are sorted.
         
-        results = []
-        for idx in sorted_indices:
-            if similarities[idx] >= threshold:
-                results.append((
-                    int(idx),
-                    float(similarities[idx]),
-                    documents[idx]
-                ))
+        Args:
+            query_embeddings: Shape (n_queries, embedding_dim)
+            doc_embeddings: Shape (n_docs, embedding_dim)
+            top_k: Number of results per query
+            
+        Returns:
+            (scores, indices), each shape (n_queries, min(top_k, n_docs)),
+            sorted by descending similarity
+        """
+        queries = _normalize_rows(np.atleast_2d(query_embeddings))
+        docs = _normalize_rows(np.atleast_2d(doc_embeddings))
+        k = min(top_k, len(docs))
+        if k <= 0:
+            return (
+                np.empty((len(queries), 0), dtype=np.float32),
+                np.empty((len(queries), 0), dtype=np.int64)
+            )
         
-        return results
+        similarities = queries @ docs.T
+        if k < similarities.shape[1]:
+            candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(similarities.shape[1]), similarities.shape)
+        candidate_scores = np.take_along_axis(similarities, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        return (
+            np.take_along_axis(candidate_scores, order, axis=1),
+            np.take_along_axis(candidates, order, axis=1).astype(np.int64)
+        )
     
     def chunk_text(self, text: str, chunk_size: int = 200, overlap: int = 50) -> List[str]:
         """
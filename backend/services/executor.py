@@ -0,0 +1,104 @@
+"""
+Stage Executor Service
+Runs CPU-bound pipeline stages off the asyncio event loop.
+"""
+
+import os
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class StageExecutor:
+    """
+    Per-stage worker pools for CPU-bound pipeline work.
+    Each stage gets its own thread or process pool plus a semaphore bounding
+    how many calls may be in flight, so a burst of large PDFs can't starve
+    scoring, and the event loop stays free to serve other requests.
+    """
+
+    # stage -> (default kind, default workers)
+    STAGES = {
+        "parse": ("thread", min(4, os.cpu_count() or 1)),
+        "clean": ("thread", 2),
+        "skills": ("thread", 2),
+        "score": ("thread", 2),
+    }
+
+    # Stages whose callables are cheap to pickle and safe to run in another
+    # process. Scoring holds the embedding model and must stay in-process.
+    PROCESS_SAFE = {"parse", "clean"}
+
+    def __init__(self):
+        """
+        Create the pools.
+
+        Each stage is configured from the environment:
+            EXECUTOR_<STAGE>_KIND: "thread" or "process"
+            EXECUTOR_<STAGE>_WORKERS: pool size
+            EXECUTOR_<STAGE>_MAX_PENDING: max calls queued or running
+        """
+        self.config: Dict[str, Dict[str, Any]] = {}
+        self._pools: Dict[str, Executor] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+
+        for stage, (default_kind, default_workers) in self.STAGES.items():
+            prefix = f"EXECUTOR_{stage.upper()}_"
+            kind = os.getenv(prefix + "KIND", default_kind).lower()
+            workers = max(1, int(os.getenv(prefix + "WORKERS", default_workers)))
+            max_pending = max(1, int(os.getenv(prefix + "MAX_PENDING", workers * 4)))
+
+            if kind == "process" and stage not in self.PROCESS_SAFE:
+                print(f"Warning: stage '{stage}' cannot run in a process pool. Using threads.")
+                kind = "thread"
+
+            if kind == "process":
+                pool = ProcessPoolExecutor(max_workers=workers)
+            else:
+                kind = "thread"
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"stage-{stage}")
+
+            self.config[stage] = {"kind": kind, "workers": workers, "max_pending": max_pending}
+            self._pools[stage] = pool
+            self._semaphores[stage] = asyncio.Semaphore(max_pending)
+            self._in_flight[stage] = 0
+
+    async def run(self, stage: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a callable on the given stage's pool.
+
+        Args:
+            stage: Stage name (see STAGES)
+            fn: Callable to run. Must be picklable for process stages.
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            The callable's return value
+        """
+        if stage not in self._pools:
+            raise ValueError(f"Unknown stage: {stage}. Available: {list(self._pools)}")
+
+        call = functools.partial(fn, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+
+        async with self._semaphores[stage]:
+            self._in_flight[stage] += 1
+            try:
+                return await loop.run_in_executor(self._pools[stage], call)
+            finally:
+                self._in_flight[stage] -= 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return configuration and current load per stage."""
+        return {
+            stage: {**config, "in_flight": self._in_flight[stage]}
+            for stage, config in self.config.items()
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down all pools."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
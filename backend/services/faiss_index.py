@@ -4,7 +4,10 @@ Provides vector similarity search using Facebook AI Similarity Search.
 """
 
 import os
-from typing import List, Tuple, Optional
+import json
+import struct
+import threading
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Sequence, Union
 import numpy as np
 
 try:
@@ -15,51 +18,533 @@ except ImportError:
     print("Warning: FAISS not available. Using numpy-based similarity search.")
 
 
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+
+# Binary persistence format
+FORMAT_VERSION = 3
+VECTOR_MAGIC = b"RIVX"
+# magic, format version, dtype code, dimension, row count; padded to 32 bytes
+VECTOR_HEADER = struct.Struct("<4sHHIQ")
+VECTOR_HEADER_SIZE = 32
+DTYPE_CODES = {np.dtype(np.float32): 0, np.dtype(np.float16): 1}
+
+
+def _replace_atomically(path: str, write) -> None:
+    """Write a file through a temporary sibling and rename it into place."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+class _DocumentStore:
+    """
+    Document texts addressed by row.
+    Documents loaded from disk stay in a memory-mapped UTF-8 blob and are
+    decoded only when accessed; documents added afterwards live in memory.
+    Rows are never renumbered: discarded rows keep their slot but release
+    their in-memory text (mapped rows are left to the page cache and are
+    dropped from disk by the next save).
+    """
+    
+    def __init__(self, blob=None, offsets: Optional[np.ndarray] = None):
+        self._blob = blob if blob is not None else b""
+        self._offsets = offsets if offsets is not None else np.zeros(1, dtype=np.int64)
+        self._base = len(self._offsets) - 1
+        # None marks a discarded row
+        self._extra: List[Optional[str]] = []
+    
+    @classmethod
+    def open(cls, blob_path: str, offsets_path: str) -> "_DocumentStore":
+        """Map a saved blob and its offsets array without reading them."""
+        offsets = np.load(offsets_path, mmap_mode="r")
+        blob = np.memmap(blob_path, dtype=np.uint8, mode="r") if os.path.getsize(blob_path) else None
+        return cls(blob, offsets)
+    
+    def __len__(self) -> int:
+        return self._base + len(self._extra)
+    
+    def __getitem__(self, row: int) -> str:
+        if row < 0:
+            row += len(self)
+        if row < self._base:
+            return self._encoded(row).decode("utf-8")
+        return self._extra[row - self._base] or ""
+    
+    def __iter__(self) -> Iterator[str]:
+        for row in range(len(self)):
+            yield self[row]
+    
+    def _encoded(self, row: int) -> bytes:
+        """UTF-8 bytes of one row, without a decode/encode round trip for mapped rows."""
+        if row < self._base:
+            return bytes(self._blob[self._offsets[row]:self._offsets[row + 1]])
+        return (self._extra[row - self._base] or "").encode("utf-8")
+    
+    def extend(self, documents: Iterable[str]) -> None:
+        self._extra.extend(documents)
+    
+    def discard(self, rows: Iterable[int]) -> None:
+        """Release the in-memory text of rows whose documents were removed."""
+        for row in rows:
+            if row >= self._base:
+                self._extra[row - self._base] = None
+    
+    def write(self, blob_path: str, offsets_path: str, rows: Optional[Sequence[int]] = None) -> None:
+        """
+        Write documents as a UTF-8 blob plus an int64 offsets array.
+        
+        Args:
+            blob_path: Destination of the blob
+            offsets_path: Destination of the offsets array
+            rows: Rows to write, in order. Defaults to all rows.
+        """
+        count = len(self) if rows is None else len(rows)
+        offsets = np.empty(count + 1, dtype=np.int64)
+        offsets[0] = 0
+        
+        def write_blob(tmp_path: str) -> None:
+            position = 0
+            with open(tmp_path, "wb") as f:
+                if rows is not None:
+                    for out_row, row in enumerate(rows, start=1):
+                        encoded = self._encoded(row)
+                        f.write(encoded)
+                        position += len(encoded)
+                        offsets[out_row] = position
+                    return
+                
+                # Documents already in a blob are copied byte-for-byte
+                if self._base:
+                    f.write(memoryview(self._blob)[:self._offsets[self._base]])
+                    offsets[:self._base + 1] = self._offsets[:self._base + 1]
+                    position = int(self._offsets[self._base])
+                for row, document in enumerate(self._extra, start=self._base + 1):
+                    encoded = (document or "").encode("utf-8")
+                    f.write(encoded)
+                    position += len(encoded)
+                    offsets[row] = position
+        
+        def write_offsets(tmp_path: str) -> None:
+            with open(tmp_path, "wb") as f:
+                np.save(f, offsets)
+        
+        _replace_atomically(blob_path, write_blob)
+        _replace_atomically(offsets_path, write_offsets)
+
+
 class FAISSIndex:
     """
     FAISS-based vector index for fast similarity search.
     Falls back to numpy-based search if FAISS is not available.
+    
+    Index types:
+        flat: exact inner-product scan (default)
+        hnsw: graph-based ANN; recall/latency tuned with ef_search
+        ivf: inverted-file ANN; needs train() before add, tuned with nprobe
+    
+    The numpy fallback always performs an exact search.
+    
+    Every document has a stable int64 ID (assigned on add unless given) that
+    search results report and remove()/upsert() accept. Flat and IVF indexes
+    delete natively through FAISS IDs. HNSW graphs and the numpy fallback
+    cannot delete in place, so removed rows are tombstoned, skipped by search
+    and dropped by compact(); the numpy fallback compacts in a background
+    thread once tombstones exceed compact_ratio of its rows.
     """
     
-    def __init__(self, embedding_dim: int = 384):
+    def __init__(
+        self,
+        embedding_dim: int = 384,
+        index_type: str = "flat",
+        hnsw_m: int = 32,
+        ef_construction: int = 80,
+        ef_search: int = 64,
+        nlist: int = 1024,
+        nprobe: int = 16,
+        storage_dtype: str = "float32",
+        compact_ratio: float = 0.25
+    ):
         """
         Initialize the FAISS index.
         
         Args:
             embedding_dim: Dimension of embedding vectors (must match embedder output)
+            index_type: "flat", "hnsw" or "ivf"
+            hnsw_m: HNSW graph degree (memory vs. recall)
+            ef_construction: HNSW build-time search depth
+            ef_search: HNSW query-time search depth (recall vs. latency)
+            nlist: Number of IVF clusters
+            nprobe: IVF clusters scanned per query (recall vs. latency)
+            storage_dtype: Numpy fallback storage, "float32" or "float16"
+                (half the memory; similarities are still computed in float32)
+            compact_ratio: Tombstoned fraction of numpy fallback rows that
+                triggers a background compaction
         """
         self.embedding_dim = embedding_dim
-        self.documents: List[str] = []
+        self.index_type = os.getenv("FAISS_INDEX_TYPE", index_type).lower()
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {self.index_type}. Available: {list(INDEX_TYPES)}")
+        
+        self.hnsw_m = int(os.getenv("FAISS_HNSW_M", hnsw_m))
+        self.ef_construction = int(os.getenv("FAISS_EF_CONSTRUCTION", ef_construction))
+        self.ef_search = int(os.getenv("FAISS_EF_SEARCH", ef_search))
+        self.nlist = int(os.getenv("FAISS_NLIST", nlist))
+        self.nprobe = int(os.getenv("FAISS_NPROBE", nprobe))
+        self.compact_ratio = float(os.getenv("FAISS_COMPACT_RATIO", compact_ratio))
+        
+        self.storage_dtype = np.dtype(os.getenv("FAISS_FALLBACK_DTYPE", storage_dtype))
+        if self.storage_dtype not in (np.float32, np.float16):
+            raise ValueError(f"Unsupported storage dtype: {self.storage_dtype}")
+        
         self.index = None
-        self.embeddings: Optional[np.ndarray] = None
+        self.read_only = False
+        # Guards mutations and swaps done by background compaction
+        self._lock = threading.RLock()
+        self._compaction: Optional[threading.Thread] = None
+        self._reset()
         
         if FAISS_AVAILABLE:
-            # Use IndexFlatIP for cosine similarity (with normalized vectors)
-            self.index = faiss.IndexFlatIP(embedding_dim)
+            self.index = self._create_index()
+    
+    def _reset(self) -> None:
+        """Empty the document and row bookkeeping."""
+        self.documents = _DocumentStore()
+        self.next_id = 0
+        # External ID -> row in self.documents, for live documents only
+        self._doc_rows: Dict[int, int] = {}
+        
+        # Row storage for indexes addressed by position (HNSW, numpy fallback):
+        # the first _count rows are used, each with its external ID and a
+        # tombstone flag
+        self._buffer: Optional[np.ndarray] = None
+        self._row_ids: Optional[np.ndarray] = None
+        self._alive: Optional[np.ndarray] = None
+        self._count = 0
+        self._dead = 0
+        # External ID -> row, for live rows only
+        self._vector_rows: Dict[int, int] = {}
     
-    def add(self, embeddings: np.ndarray, documents: List[str]) -> None:
+    @property
+    def _positional(self) -> bool:
+        """Whether vectors are addressed by row rather than by FAISS ID."""
+        return not FAISS_AVAILABLE or self.index_type == "hnsw"
+    
+    @property
+    def embeddings(self) -> Optional[np.ndarray]:
+        """
+        Normalized vectors held by the numpy fallback (a view, no copy).
+        Includes tombstoned rows until the next compaction.
+        """
+        if self._buffer is None:
+            return None
+        return self._buffer[:self._count]
+    
+    @property
+    def capacity(self) -> int:
+        """Rows allocated for the numpy fallback / HNSW row bookkeeping."""
+        return 0 if self._row_ids is None else len(self._row_ids)
+    
+    def reserve(self, capacity: int) -> None:
+        """
+        Pre-size the row storage, e.g. before a bulk ingest.
+        
+        Args:
+            capacity: Total number of vectors to make room for
+        """
+        with self._lock:
+            if not self._positional or capacity <= self.capacity:
+                return
+            
+            count = self._count
+            row_ids = np.empty(capacity, dtype=np.int64)
+            alive = np.empty(capacity, dtype=bool)
+            if count:
+                row_ids[:count] = self._row_ids[:count]
+                alive[:count] = self._alive[:count]
+            self._row_ids, self._alive = row_ids, alive
+            
+            if not FAISS_AVAILABLE:
+                buffer = np.empty((capacity, self.embedding_dim), dtype=self.storage_dtype)
+                if count:
+                    buffer[:count] = self._buffer[:count]
+                self._buffer = buffer
+    
+    def _append_rows(self, ids: np.ndarray, normalized: Optional[np.ndarray] = None) -> None:
+        """Append live rows, doubling capacity when full."""
+        start = self._count
+        needed = start + len(ids)
+        if needed > self.capacity:
+            self.reserve(max(needed, 2 * self.capacity, 64))
+        if normalized is not None:
+            self._buffer[start:needed] = normalized
+        self._row_ids[start:needed] = ids
+        self._alive[start:needed] = True
+        self._vector_rows.update(zip(ids.tolist(), range(start, needed)))
+        self._count = needed
+    
+    def _create_index(self):
+        """Build an empty FAISS index of the configured type (inner product on normalized vectors)."""
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.embedding_dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = self.ef_construction
+            index.hnsw.efSearch = self.ef_search
+            return index
+        
+        if self.index_type == "ivf":
+            quantizer = faiss.IndexFlatIP(self.embedding_dim)
+            index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, self.nlist, faiss.METRIC_INNER_PRODUCT)
+            index.nprobe = self.nprobe
+            return index
+        
+        # Use IndexFlatIP for cosine similarity (with normalized vectors);
+        # IDMap2 adds external IDs and remove_ids()
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.embedding_dim))
+    
+    @property
+    def is_trained(self) -> bool:
+        """Whether the index can accept vectors (only IVF needs training)."""
+        return self.index is None or self.index.is_trained
+    
+    def train(self, embeddings: np.ndarray) -> None:
+        """
+        Train the IVF coarse quantizer. No-op for other index types.
+        
+        Args:
+            embeddings: Representative sample, shape (n, embedding_dim).
+                Use at least ~40 * nlist vectors for good clusters.
+        """
+        if not FAISS_AVAILABLE or self.index_type != "ivf":
+            return
+        if len(embeddings) < self.nlist:
+            raise ValueError(f"IVF training needs at least nlist={self.nlist} vectors, got {len(embeddings)}")
+        self.index.train(self._normalize(embeddings).astype(np.float32))
+    
+    def set_search_params(self, ef_search: Optional[int] = None, nprobe: Optional[int] = None) -> None:
+        """
+        Adjust query-time recall knobs.
+        
+        Args:
+            ef_search: HNSW search depth
+            nprobe: IVF clusters scanned per query
+        """
+        if ef_search is not None:
+            self.ef_search = int(ef_search)
+            if FAISS_AVAILABLE and self.index_type == "hnsw":
+                self.index.hnsw.efSearch = self.ef_search
+        if nprobe is not None:
+            self.nprobe = int(nprobe)
+            if FAISS_AVAILABLE and self.index_type == "ivf":
+                self.index.nprobe = self.nprobe
+    
+    def _config(self) -> Dict:
+        """Index configuration persisted next to the saved index."""
+        return {
+            "embedding_dim": self.embedding_dim,
+            "index_type": self.index_type,
+            "hnsw_m": self.hnsw_m,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "nlist": self.nlist,
+            "nprobe": self.nprobe,
+            "storage_dtype": self.storage_dtype.name
+        }
+    
+    def add(
+        self,
+        embeddings: np.ndarray,
+        documents: List[str],
+        ids: Optional[Sequence[int]] = None
+    ) -> np.ndarray:
         """
         Add documents and their embeddings to the index.
         
         Args:
             embeddings: Document embeddings, shape (n_docs, embedding_dim)
             documents: List of document texts corresponding to embeddings
+            ids: Non-negative external IDs, one per document. Defaults to
+                consecutive IDs starting at next_id.
+        
+        Returns:
+            int64 array of the documents' IDs
         """
         if len(embeddings) != len(documents):
             raise ValueError("Number of embeddings must match number of documents")
         
-        # Normalize embeddings for cosine similarity
-        normalized = self._normalize(embeddings)
+        with self._lock:
+            self._check_writable()
+            ids = self._new_ids(len(documents), ids)
+            if not len(ids):
+                return ids
+            
+            # Normalize embeddings for cosine similarity
+            normalized = self._normalize(embeddings)
+            
+            if FAISS_AVAILABLE:
+                if not self.index.is_trained:
+                    raise RuntimeError("IVF index must be trained with train() before adding vectors")
+                if self._positional:
+                    self.index.add(normalized.astype(np.float32))
+                    self._append_rows(ids)
+                else:
+                    self.index.add_with_ids(normalized.astype(np.float32), ids)
+            else:
+                self._append_rows(ids, normalized)
+            
+            start = len(self.documents)
+            self.documents.extend(documents)
+            self._doc_rows.update(zip(ids.tolist(), range(start, start + len(ids))))
+            self.next_id = max(self.next_id, int(ids.max()) + 1)
+            return ids
+    
+    def _new_ids(self, count: int, ids: Optional[Sequence[int]]) -> np.ndarray:
+        """Assign or validate IDs for documents about to be added."""
+        if ids is None:
+            return np.arange(self.next_id, self.next_id + count, dtype=np.int64)
+        
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if len(ids) != count:
+            raise ValueError("Number of ids must match number of documents")
+        if len(ids) and ids.min() < 0:
+            raise ValueError("IDs must be non-negative")
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("Duplicate IDs in one add() call")
+        present = [doc_id for doc_id in ids.tolist() if doc_id in self._doc_rows]
+        if present:
+            raise ValueError(f"IDs already in the index: {present[:5]}; use upsert() to replace")
+        return ids
+    
+    def remove(self, ids: Union[int, Sequence[int]]) -> int:
+        """
+        Remove documents by ID. Unknown IDs are ignored.
+        
+        Args:
+            ids: One ID or a sequence of IDs
+        
+        Returns:
+            Number of documents removed
+        """
+        with self._lock:
+            self._check_writable()
+            ids = [
+                doc_id for doc_id in np.unique(np.asarray(ids, dtype=np.int64)).tolist()
+                if doc_id in self._doc_rows
+            ]
+            if not ids:
+                return 0
+            
+            self.documents.discard([self._doc_rows.pop(doc_id) for doc_id in ids])
+            
+            if self._positional:
+                rows = [self._vector_rows.pop(doc_id) for doc_id in ids]
+                self._alive[rows] = False
+                self._dead += len(rows)
+                if not FAISS_AVAILABLE and self._dead > self.compact_ratio * self._count:
+                    self.compact(wait=False)
+            else:
+                self.index.remove_ids(np.asarray(ids, dtype=np.int64))
+            return len(ids)
+    
+    def upsert(self, doc_id: int, embedding: np.ndarray, document: str) -> None:
+        """
+        Insert a document, or replace the vector and text of an existing ID.
+        
+        Args:
+            doc_id: External ID
+            embedding: Document embedding, shape (embedding_dim,)
+            document: Document text
+        """
+        with self._lock:
+            self.remove([doc_id])
+            self.add(np.asarray(embedding).reshape(1, -1), [document], ids=[doc_id])
+    
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._doc_rows
+    
+    def get_document(self, doc_id: int) -> Optional[str]:
+        """Return the text of a live document, or None."""
+        row = self._doc_rows.get(doc_id)
+        return None if row is None else self.documents[row]
+    
+    @property
+    def tombstones(self) -> int:
+        """Removed rows still occupying HNSW / numpy fallback storage."""
+        return self._dead
+    
+    def compact(self, wait: bool = True) -> None:
+        """
+        Drop tombstoned rows from HNSW / numpy fallback storage.
+        
+        The live rows are copied (and, for HNSW, the graph rebuilt) outside
+        the lock; adds and removes made meanwhile are replayed before the
+        compacted storage is swapped in. No-op for flat and IVF indexes.
+        
+        Args:
+            wait: Block until done; otherwise compact in a background thread
+        """
+        with self._lock:
+            if not self._positional or not self._dead:
+                return
+            running = self._compaction is not None and self._compaction.is_alive()
+            if not running:
+                self._compaction = threading.Thread(target=self._compact, name="faiss-compaction", daemon=True)
+                self._compaction.start()
+            compaction = self._compaction
+        if wait:
+            compaction.join()
+    
+    def _compact(self) -> None:
+        """Compaction body; see compact()."""
+        with self._lock:
+            count = self._count
+            keep = np.flatnonzero(self._alive[:count])
+            kept_ids = self._row_ids[keep].copy()
+            if FAISS_AVAILABLE:
+                # HNSW storage may be reallocated by a concurrent add
+                vectors = self.index.reconstruct_n(0, count)[keep] if count else None
+            else:
+                buffer = self._buffer
         
         if FAISS_AVAILABLE:
-            self.index.add(normalized.astype(np.float32))
+            index = self._create_index()
+            if len(keep):
+                index.add(vectors)
         else:
-            if self.embeddings is None:
-                self.embeddings = normalized
-            else:
-                self.embeddings = np.vstack([self.embeddings, normalized])
+            # Rows below count are never rewritten, so the old buffer is safe to read
+            vectors = buffer[keep]
         
-        self.documents.extend(documents)
+        with self._lock:
+            # Rows removed meanwhile stay as tombstones; rows added meanwhile are appended
+            alive = self._alive[keep]
+            appended = np.arange(count, self._count)
+            appended_ids = self._row_ids[appended].copy()
+            appended_alive = self._alive[appended].copy()
+            if FAISS_AVAILABLE:
+                if len(appended):
+                    index.add(self.index.reconstruct_n(count, len(appended)))
+                self.index = index
+                self._buffer = None
+            else:
+                appended_vectors = self._buffer[appended]
+                self._buffer = vectors
+            
+            self._row_ids = kept_ids
+            self._alive = alive
+            self._count = len(keep)
+            self._dead = int(len(keep) - alive.sum())
+            self._vector_rows = {
+                doc_id: row for row, doc_id in enumerate(kept_ids.tolist()) if alive[row]
+            }
+            if len(appended):
+                start = self._count
+                self._append_rows(appended_ids, None if FAISS_AVAILABLE else appended_vectors)
+                self._alive[start:self._count] = appended_alive
+                self._dead += int(len(appended) - appended_alive.sum())
+                for row in np.flatnonzero(~appended_alive).tolist():
+                    self._vector_rows.pop(int(appended_ids[row]), None)
     
     def search(
         self,
@@ -74,41 +559,11 @@ class FAISSIndex:
             query_embedding: Query vector
             top_k: Number of results to return
             threshold: Minimum similarity threshold
-            
+        
         Returns:
-            List of (index, similarity_score, document) tuples
+            List of (id, similarity_score, document) tuples
         """
-        if len(self.documents) == 0:
-            return []
-        
-        # Normalize query
-        query_norm = self._normalize(query_embedding.reshape(1, -1))
-        
-        if FAISS_AVAILABLE:
-            distances, indices = self.index.search(
-                query_norm.astype(np.float32),
-                min(top_k, len(self.documents))
-            )
-            
-            results = []
-            for dist, idx in zip(distances[0], indices[0]):
-                if idx != -1 and dist >= threshold:
-                    results.append((int(idx), float(dist), self.documents[idx]))
-            return results
-        else:
-            # Numpy fallback
-            similarities = np.dot(self.embeddings, query_norm.T).flatten()
-            sorted_indices = np.argsort(similarities)[::-1][:top_k]
-            
-            results = []
-            for idx in sorted_indices:
-                if similarities[idx] >= threshold:
-                    results.append((
-                        int(idx),
-                        float(similarities[idx]),
-                        self.documents[idx]
-                    ))
-            return results
+        return self.batch_search(query_embedding.reshape(1, -1), top_k, threshold)[0]
     
     def batch_search(
         self,
@@ -123,22 +578,143 @@ class FAISSIndex:
             query_embeddings: Query vectors, shape (n_queries, embedding_dim)
             top_k: Number of results per query
             threshold: Minimum similarity threshold
-            
+        
         Returns:
             List of result lists, one per query
         """
+        scores, ids = self.batch_search_arrays(query_embeddings, top_k)
+        doc_rows = self._doc_rows
+        
         results = []
-        for query_emb in query_embeddings:
-            results.append(self.search(query_emb, top_k, threshold))
+        for row_scores, row_ids in zip(scores.tolist(), ids.tolist()):
+            results.append([
+                (doc_id, score, self.documents[doc_rows[doc_id]])
+                for score, doc_id in zip(row_scores, row_ids)
+                # An ID may be removed between the search and this lookup
+                if doc_id != -1 and score >= threshold and doc_id in doc_rows
+            ])
         return results
     
-    def clear(self) -> None:
-        """Clear all documents from the index."""
-        self.documents = []
+    def batch_search_arrays(
+        self,
+        query_embeddings: np.ndarray,
+        top_k: int = 5
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search for multiple queries, returning raw score and ID matrices.
+        
+        The whole query matrix goes to FAISS in one call; the numpy fallback
+        uses one matrix product per block of queries and partial selection.
+        
+        Args:
+            query_embeddings: Query vectors, shape (n_queries, embedding_dim)
+            top_k: Number of results per query
+        
+        Returns:
+            (scores, ids), each shape (n_queries, min(top_k, size)),
+            sorted by descending score. Unfilled slots have ID -1.
+        """
+        queries = self._normalize(
+            np.asarray(query_embeddings, dtype=np.float32).reshape(-1, self.embedding_dim)
+        ).astype(np.float32)
+        k = min(top_k, self.size)
+        
+        if k <= 0 or len(queries) == 0:
+            return (
+                np.empty((len(queries), 0), dtype=np.float32),
+                np.empty((len(queries), 0), dtype=np.int64)
+            )
+        
         if FAISS_AVAILABLE:
-            self.index = faiss.IndexFlatIP(self.embedding_dim)
+            with self._lock:
+                if not self._positional:
+                    scores, ids = self.index.search(queries, k)
+                    return scores, ids.astype(np.int64)
+                # Over-fetch so k live rows survive the tombstone filter
+                scores, rows = self.index.search(queries, min(k + self._dead, self._count))
+                return self._live_top_k(scores, rows, self._row_ids, self._alive, k)
+        
+        with self._lock:
+            embeddings = self.embeddings
+            row_ids = self._row_ids
+            alive = self._alive[:self._count].copy() if self._dead else None
+        
+        # Numpy fallback: bound the similarity block to ~32M floats
+        block = max(1, (1 << 25) // len(embeddings))
+        scores = np.empty((len(queries), k), dtype=np.float32)
+        rows = np.empty((len(queries), k), dtype=np.int64)
+        for start in range(0, len(queries), block):
+            similarities = self._similarities(queries[start:start + block], embeddings)
+            if alive is not None:
+                similarities[:, ~alive] = -np.inf
+            scores[start:start + block], rows[start:start + block] = self._top_k(similarities, k)
+        
+        ids = row_ids[rows]
+        ids[np.isneginf(scores)] = -1
+        return scores, ids
+    
+    @staticmethod
+    def _live_top_k(
+        scores: np.ndarray,
+        rows: np.ndarray,
+        row_ids: np.ndarray,
+        alive: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Keep the first k live rows of each sorted result row and map them to IDs."""
+        valid = rows >= 0
+        valid[valid] = alive[rows[valid]]
+        # Stable sort moves dead rows to the end while keeping score order
+        order = np.argsort(~valid, axis=1, kind="stable")[:, :k]
+        scores = np.take_along_axis(scores, order, axis=1)
+        rows = np.take_along_axis(rows, order, axis=1)
+        ids = np.where(np.take_along_axis(valid, order, axis=1), row_ids[np.maximum(rows, 0)], -1)
+        return scores, ids
+    
+    def _similarities(
+        self,
+        queries: np.ndarray,
+        embeddings: np.ndarray,
+        rows_per_chunk: int = 65536
+    ) -> np.ndarray:
+        """
+        Query-by-document similarity matrix for the numpy fallback.
+        
+        float16 storage is upcast one chunk of rows at a time, so a full
+        float32 copy of the corpus is never materialized.
+        """
+        if embeddings.dtype == np.float32:
+            return queries @ embeddings.T
+        
+        similarities = np.empty((len(queries), len(embeddings)), dtype=np.float32)
+        for start in range(0, len(embeddings), rows_per_chunk):
+            chunk = embeddings[start:start + rows_per_chunk].astype(np.float32)
+            similarities[:, start:start + rows_per_chunk] = queries @ chunk.T
+        return similarities
+    
+    @staticmethod
+    def _top_k(similarities: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row-wise top-k of a similarity matrix via partial selection."""
+        if k < similarities.shape[1]:
+            candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
         else:
-            self.embeddings = None
+            candidates = np.broadcast_to(np.arange(similarities.shape[1]), similarities.shape)
+        candidate_scores = np.take_along_axis(similarities, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        return (
+            np.take_along_axis(candidate_scores, order, axis=1),
+            np.take_along_axis(candidates, order, axis=1)
+        )
+    
+    def clear(self) -> None:
+        """Clear all documents from the index."""
+        if self._compaction is not None:
+            self._compaction.join()
+        with self._lock:
+            self._reset()
+            self.read_only = False
+            if FAISS_AVAILABLE:
+                self.index = self._create_index()
     
     def _normalize(self, vectors: np.ndarray) -> np.ndarray:
         """L2 normalize vectors for cosine similarity."""
@@ -146,32 +722,185 @@ class FAISSIndex:
         norms = np.where(norms == 0, 1, norms)  # Avoid division by zero
         return vectors / norms
     
+    def _check_writable(self) -> None:
+        """Refuse mutations of a FAISS index whose vectors are memory-mapped."""
+        if self.read_only:
+            raise RuntimeError("Index was loaded memory-mapped and is read-only; load with mmap=False to modify it")
+    
     def save(self, path: str) -> None:
-        """Save index to disk."""
-        if FAISS_AVAILABLE:
-            faiss.write_index(self.index, f"{path}.index")
-        else:
-            np.save(f"{path}.npy", self.embeddings)
+        """
+        Save index to disk. Only live documents are written; HNSW tombstones
+        are compacted first.
         
-        # Save documents
-        with open(f"{path}.docs", "w", encoding="utf-8") as f:
-            for doc in self.documents:
-                f.write(doc.replace("\n", "\\n") + "\n")
+        Files written:
+            <path>.meta.json: format version, next ID and index configuration
+            <path>.index (FAISS) or <path>.vec (numpy): vectors
+            <path>.ids.npy: int64 external ID of each saved document
+            <path>.docs.bin / <path>.docs.offsets.npy: UTF-8 document blob and
+                int64 offsets (row i spans offsets[i]:offsets[i + 1])
+        """
+        while True:
+            # Never join a background compaction while holding the lock it needs
+            if self._compaction is not None:
+                self._compaction.join()
+            with self._lock:
+                if self._compaction is not None and self._compaction.is_alive():
+                    continue
+                # Compacting under the same lock as the write means no remove()
+                # can tombstone a row in between, which would misalign the
+                # HNSW rows with the IDs written
+                if FAISS_AVAILABLE and self._positional and self._dead:
+                    self._compact()
+                self._write(path)
+                return
     
-    def load(self, path: str) -> None:
-        """Load index from disk."""
+    def _write(self, path: str) -> None:
+        """Write the index files; the caller holds the lock."""
+        if self._positional:
+            live = np.flatnonzero(self._alive[:self._count]) if self._count else np.empty(0, dtype=np.int64)
+            ids = self._row_ids[live] if len(live) else np.empty(0, dtype=np.int64)
+        else:
+            # FAISS keeps its own ID map; documents are written in insertion order
+            ids = np.array(sorted(self._doc_rows, key=self._doc_rows.get), dtype=np.int64)
+        
         if FAISS_AVAILABLE:
-            self.index = faiss.read_index(f"{path}.index")
+            _replace_atomically(f"{path}.index", lambda tmp_path: faiss.write_index(self.index, tmp_path))
         else:
-            self.embeddings = np.load(f"{path}.npy")
+            vectors = self.embeddings if not self._dead else self._buffer[live]
+            _replace_atomically(f"{path}.vec", lambda tmp_path: self._write_vectors(tmp_path, vectors))
+        
+        def write_ids(tmp_path: str) -> None:
+            with open(tmp_path, "wb") as f:
+                np.save(f, ids)
+        
+        _replace_atomically(f"{path}.ids.npy", write_ids)
+        self.documents.write(
+            f"{path}.docs.bin",
+            f"{path}.docs.offsets.npy",
+            rows=[self._doc_rows[doc_id] for doc_id in ids.tolist()]
+        )
         
-        # Load documents
-        self.documents = []
-        with open(f"{path}.docs", "r", encoding="utf-8") as f:
-            for line in f:
-                self.documents.append(line.strip().replace("\\n", "\n"))
+        def write_meta(tmp_path: str) -> None:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"format_version": FORMAT_VERSION, "next_id": self.next_id, **self._config()}, f)
+        
+        # Written last: its presence marks a complete save
+        _replace_atomically(f"{path}.meta.json", write_meta)
+    
+    def _write_vectors(self, vec_path: str, embeddings: Optional[np.ndarray]) -> None:
+        """Write numpy fallback vectors with a self-describing header."""
+        if embeddings is None:
+            embeddings = np.empty((0, self.embedding_dim), dtype=self.storage_dtype)
+        
+        with open(vec_path, "wb") as f:
+            header = VECTOR_HEADER.pack(
+                VECTOR_MAGIC,
+                FORMAT_VERSION,
+                DTYPE_CODES[embeddings.dtype],
+                self.embedding_dim,
+                len(embeddings)
+            )
+            f.write(header.ljust(VECTOR_HEADER_SIZE, b"\0"))
+            for start in range(0, len(embeddings), 65536):
+                f.write(np.ascontiguousarray(embeddings[start:start + 65536]).tobytes())
+    
+    def _open_vectors(self, vec_path: str) -> None:
+        """Memory-map the numpy fallback vectors written by _write_vectors."""
+        with open(vec_path, "rb") as f:
+            magic, version, dtype_code, dim, count = VECTOR_HEADER.unpack(f.read(VECTOR_HEADER.size))
+        
+        if magic != VECTOR_MAGIC:
+            raise ValueError(f"{vec_path} is not a vector file")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{vec_path} has format version {version}; this build reads up to {FORMAT_VERSION}")
+        if dim != self.embedding_dim:
+            raise ValueError(f"{vec_path} has dimension {dim}, expected {self.embedding_dim}")
+        
+        dtype = next(dtype for dtype, code in DTYPE_CODES.items() if code == dtype_code)
+        self.storage_dtype = dtype
+        # Read-only mapping; the first append copies into a private buffer
+        self._buffer = np.memmap(
+            vec_path,
+            dtype=dtype,
+            mode="r",
+            offset=VECTOR_HEADER_SIZE,
+            shape=(count, dim)
+        ) if count else None
+        self._count = count
+    
+    def load(self, path: str, mmap: Optional[bool] = None) -> None:
+        """
+        Load index from disk.
+        
+        Documents are memory-mapped and decoded lazily. Numpy fallback
+        vectors are always memory-mapped. FAISS vectors are memory-mapped only
+        when mmap is set, which makes the index read-only.
+        
+        Args:
+            path: Path prefix passed to save()
+            mmap: Memory-map FAISS vectors. Defaults to FAISS_MMAP_LOAD.
+        """
+        if mmap is None:
+            mmap = os.getenv("FAISS_MMAP_LOAD", "false").lower() == "true"
+        if self._compaction is not None:
+            self._compaction.join()
+        
+        # Restore the index type and recall knobs (absent for older saves)
+        version = 1
+        next_id = None
+        if os.path.exists(f"{path}.meta.json"):
+            with open(f"{path}.meta.json", "r", encoding="utf-8") as f:
+                config = json.load(f)
+            version = config.pop("format_version", 1)
+            next_id = config.pop("next_id", None)
+            for key, value in config.items():
+                setattr(self, key, np.dtype(value) if key == "storage_dtype" else value)
+        
+        with self._lock:
+            self._reset()
+            
+            if version >= 2:
+                self.documents = _DocumentStore.open(f"{path}.docs.bin", f"{path}.docs.offsets.npy")
+            else:
+                # Legacy text format: one escaped document per line
+                with open(f"{path}.docs", "r", encoding="utf-8") as f:
+                    self.documents.extend(line.strip().replace("\\n", "\n") for line in f)
+            
+            # Saves before format 3 identified documents by position
+            if version >= 3:
+                ids = np.load(f"{path}.ids.npy", allow_pickle=False)
+            else:
+                ids = np.arange(len(self.documents), dtype=np.int64)
+            self._doc_rows = dict(zip(ids.tolist(), range(len(ids))))
+            self.next_id = next_id if next_id is not None else (int(ids.max()) + 1 if len(ids) else 0)
+            
+            if FAISS_AVAILABLE:
+                flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) if mmap else 0
+                self.index = faiss.read_index(f"{path}.index", flags)
+                self.read_only = bool(mmap)
+                if self.index_type == "flat" and not isinstance(self.index, faiss.IndexIDMap2):
+                    # Older saves hold a bare IndexFlatIP; IDs equal rows there
+                    index = self._create_index()
+                    if self.index.ntotal:
+                        index.add_with_ids(self.index.reconstruct_n(0, self.index.ntotal), ids)
+                    self.index = index
+                self.set_search_params(ef_search=self.ef_search, nprobe=self.nprobe)
+            else:
+                self.read_only = False
+                if version >= 2:
+                    self._open_vectors(f"{path}.vec")
+                else:
+                    embeddings = np.load(f"{path}.npy", allow_pickle=False)
+                    self._buffer = embeddings.astype(self.storage_dtype, copy=False)
+                    self._count = len(self._buffer)
+            
+            if self._positional:
+                self._row_ids = ids.copy()
+                self._alive = np.ones(len(ids), dtype=bool)
+                self._count = len(ids)
+                self._vector_rows = dict(self._doc_rows)
     
     @property
     def size(self) -> int:
-        """Return number of documents in index."""
-        return len(self.documents)
+        """Return number of live documents in index."""
+        return len(self._doc_rows)
@@ -0,0 +1,424 @@
+"""
+Job Queue Service
+Asynchronous analysis jobs with polling, bounded depth and result retention.
+"""
+
+import os
+import json
+import time
+import uuid
+import base64
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+# A handler takes the job payload and returns (result, stage timings)
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Tuple[Dict[str, Any], Dict[str, Any]]]]
+
+TERMINAL_STATES = ("succeeded", "failed")
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit."""
+
+
+class MemoryJobBackend:
+    """
+    In-process job backend.
+    Jobs, payloads and the pending queue live in this process only, so jobs
+    are lost on restart and are not shared between workers.
+    """
+
+    def __init__(self, max_depth: int, result_ttl: float):
+        """
+        Args:
+            max_depth: Maximum number of queued (not yet running) jobs
+            result_ttl: Seconds a job record is kept after it was created or finished
+        """
+        self.result_ttl = result_ttl
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=max_depth)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._payloads: Dict[str, Dict[str, Any]] = {}
+        self._expires: Dict[str, float] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+
+    async def enqueue(self, job: Dict[str, Any], payload: Dict[str, Any]) -> None:
+        """Store a new job and queue it. Raises QueueFullError at the depth limit."""
+        self._purge_expired()
+        if self._queue.full():
+            raise QueueFullError()
+
+        job_id = job["job_id"]
+        self._jobs[job_id] = job
+        self._payloads[job_id] = payload
+        self._expires[job_id] = time.time() + self.result_ttl
+        self._events[job_id] = asyncio.Event()
+        self._queue.put_nowait(job_id)
+
+    async def dequeue(self, timeout: float) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Wait up to timeout seconds for the next job and its payload."""
+        try:
+            job_id = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        payload = self._payloads.pop(job_id, None)
+        job = self._jobs.get(job_id)
+        if job is None or payload is None:
+            return None
+        return dict(job), payload
+
+    async def save(self, job: Dict[str, Any]) -> None:
+        """Persist a job record, restarting its retention window when it finishes."""
+        job_id = job["job_id"]
+        self._jobs[job_id] = job
+        if job["status"] in TERMINAL_STATES:
+            self._expires[job_id] = time.time() + self.result_ttl
+            event = self._events.get(job_id)
+            if event is not None:
+                event.set()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job record, or None if unknown or expired."""
+        self._purge_expired()
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def wait(self, job_id: str, timeout: float) -> None:
+        """Block until the job finishes or timeout seconds pass."""
+        event = self._events.get(job_id)
+        if event is None:
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def depth(self) -> int:
+        """Number of queued jobs."""
+        return self._queue.qsize()
+
+    async def close(self) -> None:
+        """Nothing to release for the in-process backend."""
+
+    def _purge_expired(self) -> None:
+        """Drop job records whose retention window has passed."""
+        now = time.time()
+        for job_id in [job_id for job_id, expires in self._expires.items() if expires <= now]:
+            job = self._jobs.get(job_id)
+            # Never drop jobs that are still queued or running
+            if job is not None and job["status"] not in TERMINAL_STATES:
+                continue
+            self._jobs.pop(job_id, None)
+            self._payloads.pop(job_id, None)
+            self._expires.pop(job_id, None)
+            self._events.pop(job_id, None)
+
+
+class RedisJobBackend:
+    """
+    Redis-backed job backend.
+    Job records, payloads and the pending list live in Redis, so several API
+    workers can share one queue and results survive an API restart. Any
+    redis.asyncio-compatible client works (e.g. fakeredis for local runs).
+    """
+
+    def __init__(
+        self,
+        max_depth: int,
+        result_ttl: float,
+        url: Optional[str] = None,
+        client: Any = None,
+        prefix: str = "resume-jobs:"
+    ):
+        """
+        Args:
+            max_depth: Maximum number of queued (not yet running) jobs
+            result_ttl: Seconds a job record is kept after it was created or finished
+            url: Redis URL, used when no client is given
+            client: Existing redis.asyncio-compatible client
+            prefix: Key prefix for all job keys
+        """
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise ImportError("The Redis job backend requires the 'redis' package")
+            client = redis_asyncio.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379"))
+
+        self.client = client
+        self.max_depth = max_depth
+        self.result_ttl = max(1, int(result_ttl))
+        self.prefix = prefix
+        self.queue_key = f"{prefix}queue"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}job:{job_id}"
+
+    def _payload_key(self, job_id: str) -> str:
+        return f"{self.prefix}payload:{job_id}"
+
+    @staticmethod
+    def _encode_payload(payload: Dict[str, Any]) -> str:
+        """JSON-encode a payload, carrying bytes values as base64."""
+        return json.dumps({
+            key: {"__bytes__": base64.b64encode(value).decode("ascii")} if isinstance(value, bytes) else value
+            for key, value in payload.items()
+        })
+
+    @staticmethod
+    def _decode_payload(raw: Any) -> Dict[str, Any]:
+        """Inverse of _encode_payload."""
+        return {
+            key: base64.b64decode(value["__bytes__"]) if isinstance(value, dict) and "__bytes__" in value else value
+            for key, value in json.loads(raw).items()
+        }
+
+    async def enqueue(self, job: Dict[str, Any], payload: Dict[str, Any]) -> None:
+        """
+        Store a new job and queue it. Raises QueueFullError at the depth limit.
+
+        The depth check and the push are separate commands, so concurrent
+        submitters may overshoot the limit by a few jobs.
+        """
+        if await self.client.llen(self.queue_key) >= self.max_depth:
+            raise QueueFullError()
+
+        job_id = job["job_id"]
+        pipe = self.client.pipeline()
+        pipe.set(self._job_key(job_id), json.dumps(job), ex=self.result_ttl)
+        pipe.set(self._payload_key(job_id), self._encode_payload(payload), ex=self.result_ttl)
+        pipe.lpush(self.queue_key, job_id)
+        await pipe.execute()
+
+    async def dequeue(self, timeout: float) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Wait up to timeout seconds for the next job and its payload."""
+        item = await self.client.brpop(self.queue_key, timeout=max(1, int(timeout)))
+        if item is None:
+            return None
+
+        job_id = item[1].decode() if isinstance(item[1], bytes) else item[1]
+        pipe = self.client.pipeline()
+        pipe.get(self._job_key(job_id))
+        pipe.get(self._payload_key(job_id))
+        pipe.delete(self._payload_key(job_id))
+        raw_job, raw_payload, _ = await pipe.execute()
+        if raw_job is None or raw_payload is None:
+            # Expired while waiting in the queue
+            return None
+        return json.loads(raw_job), self._decode_payload(raw_payload)
+
+    async def save(self, job: Dict[str, Any]) -> None:
+        """Persist a job record, restarting its retention window."""
+        await self.client.set(self._job_key(job["job_id"]), json.dumps(job), ex=self.result_ttl)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job record, or None if unknown or expired."""
+        raw = await self.client.get(self._job_key(job_id))
+        return json.loads(raw) if raw is not None else None
+
+    async def wait(self, job_id: str, timeout: float) -> None:
+        """Poll until the job finishes or timeout seconds pass."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = await self.get(job_id)
+            if job is None or job["status"] in TERMINAL_STATES:
+                return
+            await asyncio.sleep(min(0.25, max(0.0, deadline - time.monotonic())))
+
+    async def depth(self) -> int:
+        """Number of queued jobs."""
+        return await self.client.llen(self.queue_key)
+
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if close is not None:
+            await close()
+
+
+def create_job_backend(max_depth: int, result_ttl: float):
+    """
+    Build the backend selected by JOB_QUEUE_BACKEND ("memory" or "redis").
+
+    Args:
+        max_depth: Maximum number of queued jobs
+        result_ttl: Result retention in seconds
+
+    Returns:
+        A job backend instance
+    """
+    kind = os.getenv("JOB_QUEUE_BACKEND", "memory").lower()
+    if kind == "redis":
+        if REDIS_AVAILABLE:
+            return RedisJobBackend(max_depth, result_ttl)
+        print("Warning: JOB_QUEUE_BACKEND=redis requires the 'redis' package. Using in-memory queue.")
+    return MemoryJobBackend(max_depth, result_ttl)
+
+
+class JobQueue:
+    """
+    Asynchronous job runner for long analyses.
+    Clients submit work, get a job id back immediately and poll (or long-poll)
+    for the result, so no HTTP connection is held open while the LLM stages
+    run. A fixed pool of worker tasks drains the queue in this process.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, JobHandler],
+        backend: Any = None,
+        workers: int = 4,
+        max_depth: int = 100,
+        result_ttl: float = 3600
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            handlers: Job kind -> async handler returning (result, timings)
+            backend: Job backend. Defaults to create_job_backend().
+            workers: Number of worker tasks
+            max_depth: Maximum number of queued jobs
+            result_ttl: Seconds finished jobs are retained
+        """
+        self.handlers = handlers
+        self.workers = max(1, int(os.getenv("JOB_WORKERS", workers)))
+        self.max_depth = max(1, int(os.getenv("JOB_QUEUE_MAX_DEPTH", max_depth)))
+        self.result_ttl = float(os.getenv("JOB_RESULT_TTL", result_ttl))
+        self.backend = backend or create_job_backend(self.max_depth, self.result_ttl)
+
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        """Start the worker tasks."""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks and release the backend."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.backend.close()
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a job.
+
+        Args:
+            kind: Handler name
+            payload: Handler input. Values must be JSON-serializable or bytes.
+
+        Returns:
+            The new job record
+
+        Raises:
+            QueueFullError: If the queue is at its depth limit
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}. Available: {list(self.handlers)}")
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "timings": None
+        }
+        await self.backend.enqueue(job, payload)
+        return job
+
+    async def get(self, job_id: str, wait: float = 0) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job, optionally long-polling until it finishes.
+
+        Args:
+            job_id: Id returned by submit
+            wait: Seconds to wait for the job to finish before returning
+
+        Returns:
+            Job record, or None if unknown or expired
+        """
+        job = await self.backend.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATES or wait <= 0:
+            return job
+
+        await self.backend.wait(job_id, wait)
+        return await self.backend.get(job_id)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Return queue configuration and counters."""
+        return {
+            "backend": type(self.backend).__name__,
+            "workers": self.workers,
+            "running": self._running,
+            "queued": await self.backend.depth(),
+            "max_depth": self.max_depth,
+            "result_ttl": self.result_ttl,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+    async def _worker(self) -> None:
+        """Pull jobs from the backend and run them until cancelled."""
+        while True:
+            try:
+                item = await self.backend.dequeue(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job queue dequeue failed: {e}")
+                await asyncio.sleep(1.0)
+                continue
+
+            if item is not None:
+                await self._run_job(*item)
+
+    async def _run_job(self, job: Dict[str, Any], payload: Dict[str, Any]) -> None:
+        """Run one job and record its outcome and timings."""
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        await self.backend.save(job)
+
+        self._running += 1
+        start = time.perf_counter()
+        try:
+            result, stages = await self.handlers[job["kind"]](payload)
+            job["status"] = "succeeded"
+            job["result"] = result
+            self.completed += 1
+        except asyncio.CancelledError:
+            job["status"] = "failed"
+            job["error"] = {"status_code": 503, "detail": "Job cancelled during shutdown"}
+            stages = None
+            raise
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = {
+                "status_code": getattr(e, "status_code", 500),
+                "detail": getattr(e, "detail", None) or str(e)
+            }
+            stages = None
+            self.failed += 1
+        finally:
+            self._running -= 1
+            job["finished_at"] = time.time()
+            job["timings"] = {
+                "queue_ms": round((job["started_at"] - job["created_at"]) * 1000, 1),
+                "run_ms": round((time.perf_counter() - start) * 1000, 1),
+                "stages": stages
+            }
+            await asyncio.shield(self.backend.save(job))
@@ -5,10 +5,17 @@ Handles AI-powered explanations and roadmap generation using Groq or OpenAI.
 
 import os
 import json
-from typing import Dict, List, Optional
+import asyncio
+from typing import Callable, Dict, List, Optional
 
 import httpx
 
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 
 class LLMReasoner:
     """
@@ -31,9 +38,67 @@ class LLMReasoner:
         
         self.timeout = 60.0
         
+        # Connection pool configuration for the shared HTTP client
+        self.http2 = os.getenv("LLM_HTTP2", "false").lower() == "true"
+        if self.http2 and not HTTP2_AVAILABLE:
+            print("Warning: LLM_HTTP2 requires the 'h2' package. Using HTTP/1.1.")
+            self.http2 = False
+        self.limits = httpx.Limits(
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", 20)),
+            max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE", 10)),
+            keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", 120))
+        )
+        self.prewarm = os.getenv("LLM_PREWARM", "true").lower() == "true"
+        
+        # Bounds concurrent in-flight LLM calls across all requests
+        self._semaphore = asyncio.Semaphore(int(os.getenv("LLM_MAX_CONCURRENCY", 8)))
+        self._client: Optional[httpx.AsyncClient] = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+        
         # Load prompt templates
         self.prompts = self._load_prompts()
     
+    async def startup(self) -> None:
+        """
+        Open the shared HTTP client and pre-warm the provider connection.
+        
+        Pre-warming runs in the background so it never delays startup; it
+        opens the TCP/TLS connection that the first real request then reuses.
+        """
+        self._get_client()
+        if self.prewarm and self.api_key:
+            self._prewarm_task = asyncio.create_task(self._prewarm_connection())
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client."""
+        if self._prewarm_task is not None:
+            self._prewarm_task.cancel()
+            self._prewarm_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                limits=self.limits,
+                http2=self.http2
+            )
+        return self._client
+    
+    async def _prewarm_connection(self) -> None:
+        """Issue a cheap request so a pooled keep-alive connection is ready."""
+        models_url = self.api_url.rsplit("/chat/completions", 1)[0] + "/models"
+        try:
+            await self._get_client().get(
+                models_url,
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+        except Exception as e:
+            print(f"LLM connection pre-warm failed: {e}")
+    
     def _load_prompts(self) -> Dict[str, str]:
         """Load prompt templates from files."""
         prompts = {}
@@ -106,10 +171,27 @@ Output as JSON with this structure:
         }
         return defaults.get(prompt_type, "")
     
-    async def _call_llm(self, messages: List[Dict], temperature: float = 0.3) -> str:
-        """Make API call to LLM provider."""
+    async def _call_llm(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.3,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Optional[str]:
+        """
+        Make API call to LLM provider.
+        
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            on_token: Optional callback receiving content deltas as they
+                arrive. When set, the completion is requested with stream=True.
+            
+        Returns:
+            Full completion text, or None when no API key is configured or
+            the provider call failed
+        """
         if not self.api_key:
-            return self._fallback_response()
+            return None
         
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -123,9 +205,13 @@ Output as JSON with this structure:
             "max_tokens": 2000
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._semaphore:
             try:
-                response = await client.post(
+                if on_token is not None:
+                    payload["stream"] = True
+                    return await self._stream_completion(headers, payload, on_token)
+                
+                response = await self._get_client().post(
                     self.api_url,
                     headers=headers,
                     json=payload
@@ -136,21 +222,46 @@ Output as JSON with this structure:
                 return data["choices"][0]["message"]["content"]
             except Exception as e:
                 print(f"LLM API error: {e}")
-                return self._fallback_response()
+                return None
     
-    def _fallback_response(self) -> str:
-        """Return fallback response when API is unavailable."""
-        return json.dumps({
-            "error": "LLM service unavailable",
-            "message": "Please configure API keys for Groq or OpenAI"
-        })
+    async def _stream_completion(
+        self,
+        headers: Dict[str, str],
+        payload: Dict,
+        on_token: Callable[[str], None]
+    ) -> str:
+        """Read an OpenAI-compatible SSE completion, forwarding each delta."""
+        chunks = []
+        async with self._get_client().stream(
+            "POST",
+            self.api_url,
+            headers=headers,
+            json=payload
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                except (json.JSONDecodeError, KeyError, IndexError):
+                    continue
+                if delta:
+                    chunks.append(delta)
+                    on_token(delta)
+        return "".join(chunks)
     
     async def explain_rejection(
         self,
         score_data: Dict,
         missing_skills: List[str],
         resume_text: str,
-        jd_text: str
+        jd_text: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        on_degraded: Optional[Callable[[], None]] = None
     ) -> List[str]:
         """
         Generate factual rejection explanations based on scoring data.
@@ -160,6 +271,9 @@ Output as JSON with this structure:
             missing_skills: List of missing skills
             resume_text: Cleaned resume text
             jd_text: Job description text
+            on_token: Optional callback receiving raw LLM tokens as they stream
+            on_degraded: Optional callback invoked when the LLM was unavailable
+                or unusable and rule-based fallback reasons are returned
             
         Returns:
             List of specific rejection reasons
@@ -185,7 +299,9 @@ CRITICAL RULES:
             {"role": "user", "content": prompt}
         ]
         
-        response = await self._call_llm(messages, temperature=0.2)
+        response = await self._call_llm(messages, temperature=0.2, on_token=on_token)
+        if response is None:
+            return self._degraded(on_degraded, self._generate_fallback_reasons(score_data, missing_skills))
         
         try:
             # Parse JSON response
@@ -202,9 +318,17 @@ CRITICAL RULES:
                 for line in lines
                 if line.strip() and len(line.strip()) > 10
             ]
-            return reasons[:5] if reasons else self._generate_fallback_reasons(score_data, missing_skills)
+            if reasons:
+                return reasons[:5]
         
-        return self._generate_fallback_reasons(score_data, missing_skills)
+        return self._degraded(on_degraded, self._generate_fallback_reasons(score_data, missing_skills))
+    
+    @staticmethod
+    def _degraded(on_degraded: Optional[Callable[[], None]], result):
+        """Report that result is fallback output rather than an LLM answer, and return it."""
+        if on_degraded is not None:
+            on_degraded()
+        return result
     
     def _generate_fallback_reasons(
         self,
@@ -250,7 +374,9 @@ CRITICAL RULES:
         self,
         missing_skills: List[str],
         score_data: Dict,
-        job_context: str
+        job_context: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        on_degraded: Optional[Callable[[], None]] = None
     ) -> Dict:
         """
         Generate a 30-60-90 day learning roadmap.
@@ -259,6 +385,9 @@ CRITICAL RULES:
             missing_skills: List of skills to learn
             score_data: Current scoring data
             job_context: Job description or role context
+            on_token: Optional callback receiving raw LLM tokens as they stream
+            on_degraded: Optional callback invoked when the LLM was unavailable
+                or unusable and the template roadmap is returned
             
         Returns:
             Structured roadmap dictionary
@@ -285,13 +414,15 @@ CRITICAL RULES:
             {"role": "user", "content": prompt}
         ]
         
-        response = await self._call_llm(messages, temperature=0.4)
+        response = await self._call_llm(messages, temperature=0.4, on_token=on_token)
         
         try:
-            roadmap = json.loads(response)
-            return self._validate_roadmap(roadmap)
+            roadmap = json.loads(response) if response is not None else None
         except json.JSONDecodeError:
-            return self._generate_fallback_roadmap(missing_skills)
+            roadmap = None
+        if not isinstance(roadmap, dict):
+            return self._degraded(on_degraded, self._generate_fallback_roadmap(missing_skills))
+        return self._validate_roadmap(roadmap)
     
     def _validate_roadmap(self, roadmap: Dict) -> Dict:
         """Validate and clean roadmap structure."""
@@ -0,0 +1,347 @@
+"""
+Parse Sandbox Service
+Runs document parsing in supervised, time- and memory-limited worker processes.
+"""
+
+import os
+import sys
+import queue
+import socket
+import threading
+import subprocess
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Optional
+
+from services.resume_parser import ResumeParser
+
+# resource is Unix-only; without it workers run without a memory limit
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+
+def _address_space_bytes() -> int:
+    """Return this process's current virtual memory size (0 if unknown)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _worker_main(connection, max_memory_bytes: int) -> None:
+    """
+    Sandbox worker loop.
+    
+    Receives (content, filename) over the pipe and replies with
+    ("ok", text) or ("error", exception type, message) until it receives None
+    or the pipe closes.
+    """
+    parser = ResumeParser()
+    # Each worker already parses a whole document; a nested page pool could
+    # not be killed together with the worker on timeout
+    parser.page_workers = 0
+    
+    if RESOURCE_AVAILABLE and max_memory_bytes > 0:
+        # Budget on top of the interpreter and parser libraries already mapped.
+        # RLIMIT_AS is enforced everywhere on Linux (RLIMIT_RSS is not), so an
+        # oversized allocation raises MemoryError here instead of growing RSS.
+        limit = _address_space_bytes() + max_memory_bytes
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    
+    connection.send("ready")
+    while True:
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        
+        content, filename = message
+        try:
+            reply = ("ok", parser.extract_from_bytes(content, filename))
+        except MemoryError:
+            reply = ("error", "MemoryError", "")
+        except Exception as e:
+            reply = ("error", type(e).__name__, str(e))
+        
+        # Drop references before the next document so the limit applies to it alone
+        del content, message
+        connection.send(reply)
+
+
+class _SandboxWorker:
+    """
+    One parse worker process and the parent's end of its socket.
+    
+    Workers are fresh interpreters (python -m services.parse_sandbox) rather
+    than multiprocessing children: forking would copy the API process with
+    its loaded model and threads, and spawn would re-import the app's main
+    module in every worker.
+    """
+    
+    BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
+    def __init__(self, max_memory_bytes: int):
+        parent_socket, child_socket = socket.socketpair()
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [self.BACKEND_DIR, env.get("PYTHONPATH")]))
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "services.parse_sandbox", str(child_socket.fileno()), str(max_memory_bytes)],
+                pass_fds=(child_socket.fileno(),),
+                stdin=subprocess.DEVNULL,
+                env=env
+            )
+        finally:
+            child_socket.close()
+        self.connection = Connection(parent_socket.detach())
+        self.documents = 0
+        self.ready = False
+    
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+    
+    def wait_ready(self, timeout: float) -> bool:
+        """Wait for the worker's start-up handshake."""
+        if not self.ready:
+            try:
+                self.ready = self.connection.poll(timeout) and self.connection.recv() == "ready"
+            except (EOFError, OSError):
+                return False
+        return self.ready
+    
+    def stop(self, timeout: float = 1.0) -> None:
+        """Ask the worker to exit, killing it if it doesn't."""
+        try:
+            self.connection.send(None)
+            self.process.wait(timeout)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            pass
+        self.kill()
+    
+    def kill(self) -> None:
+        """Kill the worker immediately."""
+        if self.is_alive():
+            self.process.kill()
+        self.process.wait()
+        self.connection.close()
+
+
+class ParseSandbox:
+    """
+    Supervised pool of document parsing processes.
+    
+    Each document is parsed by one worker process with its own address-space
+    limit and a wall-clock timeout. A worker that times out, exhausts its
+    memory or crashes is killed and replaced right away, so a pathological
+    PDF or DOCX only fails its own request. Workers are also recycled after a
+    fixed number of documents to shed leaked or fragmented memory.
+    
+    extract_from_bytes() blocks until the document is parsed; call it from a
+    thread (the "parse" stage pool), not the event loop.
+    """
+    
+    # Seconds a new worker may take to import the parser libraries
+    STARTUP_TIMEOUT = 30.0
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: float = 30.0,
+        max_memory_mb: int = 1024,
+        max_documents: int = 200
+    ):
+        """
+        Initialize the sandbox. Worker processes start on first use (or start()).
+        
+        Args:
+            workers: Worker processes (default: min(4, CPU count))
+            timeout: Seconds a single document may take to parse
+            max_memory_mb: Memory a worker may allocate beyond its idle size (0 = no limit)
+            max_documents: Documents a worker parses before it is replaced
+        """
+        self.workers = max(1, int(os.getenv("PARSE_SANDBOX_WORKERS", workers or min(4, os.cpu_count() or 1))))
+        self.timeout = float(os.getenv("PARSE_TIMEOUT", timeout))
+        self.max_memory_mb = int(os.getenv("PARSE_MAX_MEMORY_MB", max_memory_mb))
+        self.max_documents = max(1, int(os.getenv("PARSE_MAX_DOCS_PER_WORKER", max_documents)))
+        
+        # One entry per worker slot: a live worker, or None when the slot
+        # needs a fresh process
+        self._slots: "queue.Queue[Optional[_SandboxWorker]]" = queue.Queue()
+        for _ in range(self.workers):
+            self._slots.put(None)
+        
+        self._lock = threading.Lock()
+        self._closed = False
+        self._counters = {
+            "parsed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "memory_errors": 0,
+            "crashes": 0,
+            "recycled": 0
+        }
+    
+    def start(self) -> None:
+        """
+        Start every worker process now instead of on first use, and wait for
+        their start-up handshakes.
+        
+        Blocks for up to STARTUP_TIMEOUT; call it from a worker thread.
+        
+        Raises:
+            RuntimeError: If a worker fails to start
+        """
+        slots = [self._slots.get() for _ in range(self.workers)]
+        failed = 0
+        try:
+            for index, worker in enumerate(slots):
+                slots[index] = worker or self._spawn()
+            # The interpreters boot in parallel; collect each handshake
+            for index, worker in enumerate(slots):
+                if not worker.wait_ready(self.STARTUP_TIMEOUT):
+                    worker.kill()
+                    slots[index] = None
+                    failed += 1
+        finally:
+            for worker in slots:
+                self._slots.put(worker)
+        if failed:
+            raise RuntimeError(f"{failed} of {self.workers} parse workers failed to start")
+    
+    def _spawn(self) -> _SandboxWorker:
+        return _SandboxWorker(self.max_memory_mb * 1024 * 1024)
+    
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+    
+    def _acquire(self) -> _SandboxWorker:
+        """Take a worker slot and wait until its process is ready for a document."""
+        worker = self._slots.get()
+        try:
+            if worker is not None and not worker.is_alive():
+                worker.kill()
+                worker = None
+                self._count("crashes")
+            if worker is None:
+                worker = self._spawn()
+            # Interpreter start-up is not charged to the document's timeout
+            if not worker.wait_ready(self.STARTUP_TIMEOUT):
+                raise RuntimeError("Document parser worker failed to start")
+        except Exception:
+            if worker is not None:
+                worker.kill()
+            self._slots.put(None)
+            raise
+        return worker
+    
+    def _release(self, worker: Optional[_SandboxWorker]) -> None:
+        """Return a worker slot, replacing the worker if it is spent or was killed."""
+        if worker is not None and (self._closed or worker.documents >= self.max_documents):
+            worker.stop()
+            if not self._closed:
+                self._count("recycled")
+            worker = None
+        if worker is None and not self._closed:
+            # Start the replacement now so it warms up before the next document
+            try:
+                worker = self._spawn()
+            except Exception as e:
+                print(f"Warning: could not start a parse worker: {e}")
+        self._slots.put(worker)
+    
+    def extract_from_bytes(self, content: bytes, filename: str = "") -> str:
+        """
+        Parse a document in a sandbox worker.
+        
+        Same contract as ResumeParser.extract_from_bytes.
+        
+        Args:
+            content: File content as bytes
+            filename: Original filename (fallback for format detection)
+        
+        Returns:
+            Extracted text content
+        
+        Raises:
+            ValueError: If the format is not supported
+            RuntimeError: If parsing fails, times out, exceeds the memory
+                limit or crashes the worker
+        """
+        if self._closed:
+            raise RuntimeError("Parse sandbox is closed")
+        
+        worker = self._acquire()
+        try:
+            try:
+                worker.connection.send((content, filename))
+                if not worker.connection.poll(self.timeout):
+                    worker.kill()
+                    worker = None
+                    self._count("timeouts")
+                    raise RuntimeError(f"Document parsing timed out after {self.timeout:g}s")
+                reply = worker.connection.recv()
+            except (EOFError, OSError):
+                # The worker died mid-document (native crash, OOM killer)
+                try:
+                    exit_code = worker.process.wait(1.0)
+                except subprocess.TimeoutExpired:
+                    exit_code = None
+                worker.kill()
+                worker = None
+                self._count("crashes")
+                raise RuntimeError(f"Document parser crashed (exit code {exit_code})")
+            
+            worker.documents += 1
+            if reply[0] == "ok":
+                self._count("parsed")
+                return reply[1]
+            
+            _, error_type, message = reply
+            self._count("failed")
+            if error_type == "MemoryError":
+                self._count("memory_errors")
+                # Its heap is likely fragmented now; replace it before the next document
+                worker.documents = self.max_documents
+                raise RuntimeError(f"Document parsing exceeded the {self.max_memory_mb} MB memory limit")
+            if error_type == "ValueError":
+                raise ValueError(message)
+            raise RuntimeError(message)
+        finally:
+            self._release(worker)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return configuration and counters."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "workers": self.workers,
+            "timeout": self.timeout,
+            "max_memory_mb": self.max_memory_mb,
+            "max_documents": self.max_documents,
+            **counters
+        }
+    
+    def close(self) -> None:
+        """Stop idle workers; busy ones are stopped when their document finishes."""
+        self._closed = True
+        while True:
+            try:
+                worker = self._slots.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.stop()
+
+
+if __name__ == "__main__":
+    # Worker entry point: python -m services.parse_sandbox <socket fd> <memory limit bytes>
+    _worker_main(Connection(int(sys.argv[1])), int(sys.argv[2]))
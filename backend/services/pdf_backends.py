@@ -0,0 +1,283 @@
+"""
+PDF Backends
+Interchangeable PDF text extraction engines and the fallback chain across them.
+"""
+
+import threading
+from io import BytesIO, StringIO
+from typing import Dict, Iterator, List, Optional, Set
+
+import PyPDF2
+
+# pypdfium2 and pdfminer.six are optional; PyPDF2 is always available
+try:
+    import pypdfium2
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+try:
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    PDFMINER_AVAILABLE = True
+except ImportError:
+    PDFMINER_AVAILABLE = False
+
+
+class PDFBackend:
+    """
+    Base class for a PDF text extraction engine.
+    
+    Backends are stateless and addressed by name, so a page range can be
+    handed to a worker process as (backend name, content, start, stop).
+    """
+    
+    name = ""
+    available = False
+    
+    def page_count(self, content: bytes) -> int:
+        """Return the number of pages in a PDF."""
+        raise NotImplementedError
+    
+    def iter_pages(self, content: bytes, start: int, stop: int) -> Iterator[str]:
+        """
+        Yield the text of pages [start, stop), one string per page.
+        
+        Pages without text yield an empty string, so callers can count pages.
+        
+        Args:
+            content: PDF file content
+            start: First page (0-based)
+            stop: Page after the last one to extract
+        """
+        raise NotImplementedError
+    
+    def extract_range(self, content: bytes, start: int, stop: int) -> List[str]:
+        """Return the text of pages [start, stop) as a list."""
+        return list(self.iter_pages(content, start, stop))
+    
+    def extract_pages(self, content: bytes, pages: List[int]) -> Dict[int, str]:
+        """
+        Return {page: text} for a set of (0-based) pages.
+        
+        The document is opened once and read in a single pass from the first
+        to the last requested page.
+        """
+        if not pages:
+            return {}
+        wanted = set(pages)
+        start = min(wanted)
+        return {
+            page: text
+            for page, text in enumerate(self.iter_pages(content, start, max(wanted) + 1), start)
+            if page in wanted
+        }
+
+
+def _page_content(page) -> bytes:
+    """Return a PyPDF2 page's decoded content stream(s)."""
+    contents = page.get("/Contents")
+    if contents is None:
+        return b""
+    contents = contents.get_object()
+    if isinstance(contents, PyPDF2.generic.ArrayObject):
+        return b"\n".join(stream.get_object().get_data() for stream in contents)
+    return contents.get_data()
+
+
+def _page_has_text(page) -> bool:
+    """
+    Cheap check for whether a PyPDF2 page can contain extractable text.
+    
+    Text is only ever drawn between BT/ET operators, either in the page's own
+    content stream or in a form XObject it paints. Scanned and image-only
+    pages have neither, so extract_text() (which tokenizes the whole stream)
+    can be skipped for them.
+    """
+    try:
+        if b"BT" in _page_content(page):
+            return True
+        
+        resources = page.get("/Resources")
+        if resources is None:
+            # Inherited from the page tree; let extract_text() resolve it
+            return True
+        xobjects = resources.get_object().get("/XObject")
+        if xobjects is None:
+            return False
+        return any(
+            xobject.get_object().get("/Subtype") == "/Form"
+            for xobject in xobjects.get_object().values()
+        )
+    except Exception:
+        # Unusual structure: let extract_text() decide
+        return True
+
+
+class PyPDF2Backend(PDFBackend):
+    """Pure-Python extraction with PyPDF2. Always available, but the slowest tokenizer."""
+    
+    name = "pypdf2"
+    available = True
+    
+    def page_count(self, content: bytes) -> int:
+        return len(PyPDF2.PdfReader(BytesIO(content)).pages)
+    
+    def iter_pages(self, content: bytes, start: int, stop: int) -> Iterator[str]:
+        reader = PyPDF2.PdfReader(BytesIO(content))
+        for i in range(start, min(stop, len(reader.pages))):
+            page = reader.pages[i]
+            yield (page.extract_text() or "") if _page_has_text(page) else ""
+
+
+class PdfiumBackend(PDFBackend):
+    """
+    Extraction with pypdfium2 (Chrome's PDFium engine, native code).
+    
+    Typically an order of magnitude faster than PyPDF2 and more tolerant of
+    broken cross-reference tables and unusual font encodings.
+    """
+    
+    name = "pypdfium2"
+    available = PDFIUM_AVAILABLE
+    
+    # PDFium is not thread-safe: every call into it is serialized per process
+    _lock = threading.Lock()
+    
+    def page_count(self, content: bytes) -> int:
+        with self._lock:
+            document = pypdfium2.PdfDocument(content)
+            try:
+                return len(document)
+            finally:
+                document.close()
+    
+    def iter_pages(self, content: bytes, start: int, stop: int) -> Iterator[str]:
+        with self._lock:
+            document = pypdfium2.PdfDocument(content)
+        try:
+            for i in range(start, min(stop, len(document))):
+                # The lock is released between pages so other parses interleave
+                with self._lock:
+                    page = document[i]
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_range() if textpage.count_chars() else ""
+                    textpage.close()
+                    page.close()
+                yield text.replace("\r\n", "\n")
+        finally:
+            with self._lock:
+                document.close()
+
+
+class PdfMinerBackend(PDFBackend):
+    """
+    Extraction with pdfminer.six layout analysis.
+    
+    The slowest engine, but it reconstructs reading order from glyph
+    positions, which helps multi-column resumes and PDFs whose text operators
+    are emitted out of order.
+    """
+    
+    name = "pdfminer"
+    available = PDFMINER_AVAILABLE
+    
+    def page_count(self, content: bytes) -> int:
+        return sum(1 for _ in PDFPage.get_pages(BytesIO(content)))
+    
+    def iter_pages(self, content: bytes, start: int, stop: int) -> Iterator[str]:
+        return self._iter_layout(content, set(range(start, stop)))
+    
+    def extract_pages(self, content: bytes, pages: List[int]) -> Dict[int, str]:
+        # Layout analysis is the expensive part: skip the pages in between
+        wanted = sorted(set(pages))
+        return dict(zip(wanted, self._iter_layout(content, set(wanted))))
+    
+    def _iter_layout(self, content: bytes, pagenos: Set[int]) -> Iterator[str]:
+        """Yield the laid-out text of the given pages, in page order."""
+        if not pagenos:
+            return
+        resources = PDFResourceManager()
+        laparams = LAParams()
+        pages = PDFPage.get_pages(BytesIO(content), pagenos=pagenos, maxpages=max(pagenos) + 1)
+        for page in pages:
+            output = StringIO()
+            device = TextConverter(resources, output, laparams=laparams)
+            try:
+                PDFPageInterpreter(resources, device).process_page(page)
+            finally:
+                device.close()
+            # TextConverter ends every page with a form feed
+            yield output.getvalue().rstrip("\f")
+
+
+# Fastest first; "auto" uses the first available backend and falls back down the list
+PDF_BACKENDS: Dict[str, PDFBackend] = {
+    backend.name: backend
+    for backend in (PdfiumBackend(), PyPDF2Backend(), PdfMinerBackend())
+}
+
+
+def get_backend(name: str) -> PDFBackend:
+    """
+    Look up a PDF backend by name.
+    
+    Raises:
+        ValueError: If the backend is unknown or its package is not installed
+    """
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {name}. Available: {list(PDF_BACKENDS)}")
+    backend = PDF_BACKENDS[name]
+    if not backend.available:
+        raise ValueError(f"PDF backend '{name}' is not installed")
+    return backend
+
+
+def available_backends() -> List[str]:
+    """Return the names of installed backends, fastest first."""
+    return [name for name, backend in PDF_BACKENDS.items() if backend.available]
+
+
+def backend_chain(preferred: str = "auto", fallbacks: Optional[List[str]] = None) -> List[PDFBackend]:
+    """
+    Build the per-document fallback chain.
+    
+    Args:
+        preferred: Backend tried first, or "auto" for the fastest installed one
+        fallbacks: Backends tried, in order, when an earlier one fails.
+            Defaults to every other installed backend, fastest first.
+    
+    Returns:
+        Available backends in the order they should be tried
+    """
+    preferred = preferred.lower()
+    if preferred in PDF_BACKENDS and not PDF_BACKENDS[preferred].available:
+        print(f"Warning: PDF backend '{preferred}' is not installed. Using auto.")
+        preferred = "auto"
+    names = available_backends()[:1] if preferred == "auto" else [get_backend(preferred).name]
+    
+    if fallbacks is None:
+        fallbacks = available_backends()
+    for name in fallbacks:
+        if name not in PDF_BACKENDS or not PDF_BACKENDS[name].available:
+            print(f"Warning: skipping unavailable PDF fallback backend '{name}'")
+        elif name not in names:
+            names.append(name)
+    
+    return [PDF_BACKENDS[name] for name in names]
+
+
+def text_quality(text: str) -> float:
+    """
+    Fraction of characters that look like real text.
+    
+    Letters, digits, whitespace and common punctuation count as real; glyph
+    garbage from broken font encodings (private-use code points, control
+    characters, replacement characters) does not. Empty text scores 0.
+    """
+    if not text:
+        return 0.0
+    good = sum(1 for char in text if char.isalnum() or char.isspace() or char in ".,;:!?'\"()[]/&%+-@#*•–—")
+    return good / len(text)
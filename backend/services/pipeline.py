@@ -0,0 +1,177 @@
+"""
+Pipeline Service
+Dependency-graph executor for the asynchronous analysis stages.
+"""
+
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class PipelineRun:
+    """
+    Results and timings of a single StageGraph run.
+    Times are milliseconds relative to the start of the run.
+    """
+
+    def __init__(
+        self,
+        results: Dict[str, Any],
+        timings: Dict[str, Tuple[float, float]],
+        deps: Dict[str, List[str]]
+    ):
+        self.results = results
+        self.timings = timings
+        self.critical_path = self._find_critical_path(timings, deps)
+        self.critical_path_ms = round(max((end for _, end in timings.values()), default=0.0), 1)
+
+    @staticmethod
+    def _find_critical_path(
+        timings: Dict[str, Tuple[float, float]],
+        deps: Dict[str, List[str]]
+    ) -> List[str]:
+        """Walk back from the last stage to finish through its latest-finishing input."""
+        if not timings:
+            return []
+
+        path = [max(timings, key=lambda name: timings[name][1])]
+        while True:
+            inputs = [dep for dep in deps.get(path[-1], []) if dep in timings]
+            if not inputs:
+                break
+            path.append(max(inputs, key=lambda name: timings[name][1]))
+
+        return path[::-1]
+
+    def stage_timings(self) -> Dict[str, Dict[str, float]]:
+        """Return start, end and duration per stage."""
+        return {
+            name: {
+                "start_ms": round(start, 1),
+                "end_ms": round(end, 1),
+                "duration_ms": round(end - start, 1)
+            }
+            for name, (start, end) in self.timings.items()
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Return a JSON-serializable timing report."""
+        return {
+            "critical_path": self.critical_path,
+            "critical_path_ms": self.critical_path_ms,
+            "stages": self.stage_timings()
+        }
+
+    def server_timing(self) -> str:
+        """Format timings as a Server-Timing header value."""
+        entries = [
+            f"{name.replace('_', '-')};dur={end - start:.1f}"
+            for name, (start, end) in self.timings.items()
+        ]
+        entries.append(f"critical-path;dur={self.critical_path_ms:.1f}")
+        return ", ".join(entries)
+
+
+class StageGraph:
+    """
+    Minimal dependency-graph executor for async stages.
+    Every stage starts as soon as all of its inputs are ready, so independent
+    branches of the pipeline overlap instead of running in sequence.
+    """
+
+    def __init__(self, inputs: Iterable[str] = ()):
+        """
+        Args:
+            inputs: Names of values supplied to run() rather than computed
+        """
+        self.inputs = list(inputs)
+        self._stages: Dict[str, Tuple[Callable[..., Awaitable[Any]], List[str]]] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable[Any]],
+        deps: Iterable[str] = ()
+    ) -> "StageGraph":
+        """
+        Register a stage.
+
+        Dependencies must already be registered (or be inputs), which keeps
+        the graph acyclic by construction.
+
+        Args:
+            name: Stage name; its result is passed to dependents under this name
+            fn: Async callable receiving each dependency's result as a keyword argument
+            deps: Names of the stages or inputs this stage needs
+
+        Returns:
+            The graph, for chaining
+        """
+        deps = list(deps)
+        if name in self._stages or name in self.inputs:
+            raise ValueError(f"Duplicate stage: {name}")
+        for dep in deps:
+            if dep not in self._stages and dep not in self.inputs:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+
+        self._stages[name] = (fn, deps)
+        return self
+
+    async def run(
+        self,
+        on_complete: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+        **inputs: Any
+    ) -> PipelineRun:
+        """
+        Execute the graph.
+
+        Args:
+            on_complete: Optional async callback invoked with (stage, result)
+                as each stage finishes
+            **inputs: Values for the graph inputs
+
+        Returns:
+            PipelineRun with every stage result and its timings
+
+        Raises:
+            The first exception raised by any stage; remaining stages are cancelled.
+        """
+        missing = [name for name in self.inputs if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing pipeline inputs: {missing}")
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        timings: Dict[str, Tuple[float, float]] = {}
+        futures: Dict[str, Awaitable[Any]] = {}
+
+        for name in self.inputs:
+            future = loop.create_future()
+            future.set_result(inputs[name])
+            futures[name] = future
+
+        async def run_stage(name: str, fn: Callable[..., Awaitable[Any]], deps: List[str]) -> Any:
+            kwargs = {dep: await futures[dep] for dep in deps}
+            stage_start = (time.perf_counter() - start) * 1000
+            result = await fn(**kwargs)
+            timings[name] = (stage_start, (time.perf_counter() - start) * 1000)
+            if on_complete is not None:
+                await on_complete(name, result)
+            return result
+
+        tasks = {}
+        for name, (fn, deps) in self._stages.items():
+            tasks[name] = futures[name] = asyncio.ensure_future(run_stage(name, fn, deps))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            # Let cancelled stages unwind so their errors are not reported as unretrieved
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        results = {name: task.result() for name, task in tasks.items()}
+        deps = {name: stage_deps for name, (_, stage_deps) in self._stages.items()}
+        return PipelineRun(results, timings, deps)
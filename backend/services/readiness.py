@@ -0,0 +1,78 @@
+"""
+Readiness Service
+Tracks background loading of heavy components for liveness/readiness probes.
+"""
+
+import time
+import asyncio
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class ReadinessTracker:
+    """
+    Per-component load state for startup probes.
+    Heavy components (e.g. the embedding model) load in worker threads after
+    the server has bound its port; the tracker records each component's
+    state, load duration and any error so the readiness probe only passes
+    once everything the API needs is warm.
+    """
+
+    def __init__(self, components: Iterable[str]):
+        """
+        Args:
+            components: Names of the components that must be ready
+        """
+        self.started_at = time.time()
+        self._components: Dict[str, Dict[str, Any]] = {
+            name: {"state": "pending", "load_ms": None, "error": None}
+            for name in components
+        }
+
+    async def load(self, name: str, factory: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Build a component in a worker thread, recording state and duration.
+
+        Args:
+            name: Component name
+            factory: Blocking callable that builds the component
+            *args: Positional arguments for factory
+            **kwargs: Keyword arguments for factory
+
+        Returns:
+            The built component
+
+        Raises:
+            Whatever the factory raises; the component is marked failed.
+        """
+        component = self._components.setdefault(name, {"state": "pending", "load_ms": None, "error": None})
+        component["state"] = "loading"
+        start = time.perf_counter()
+        try:
+            value = await asyncio.to_thread(factory, *args, **kwargs)
+        except Exception as e:
+            component["state"] = "failed"
+            component["error"] = str(e)
+            raise
+        finally:
+            component["load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        component["state"] = "ready"
+        return value
+
+    def mark_ready(self, name: str) -> None:
+        """Mark a component that needs no loading as ready."""
+        self._components[name] = {"state": "ready", "load_ms": 0.0, "error": None}
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        """Return whether one component (or all, when name is None) is ready."""
+        if name is not None:
+            return self._components.get(name, {}).get("state") == "ready"
+        return all(component["state"] == "ready" for component in self._components.values())
+
+    def report(self) -> Dict[str, Any]:
+        """Return overall readiness and per-component state."""
+        return {
+            "ready": self.is_ready(),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "components": {name: dict(component) for name, component in self._components.items()}
+        }
@@ -0,0 +1,199 @@
+"""
+Result Cache Service
+Content-addressed caching of full analysis results.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class ResultCache:
+    """
+    Two-tier cache for analysis results.
+    A bounded in-memory LRU tier is backed by an optional on-disk tier so that
+    repeat requests survive restarts and are shared between workers. Entries
+    in both tiers expire ttl seconds after they were stored, so results with
+    LLM-written sections are regenerated periodically.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None, ttl: float = 86400):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of results kept in memory
+            cache_dir: Directory for the on-disk tier. Disabled when empty.
+            ttl: Seconds an entry stays valid (0 = never expires)
+        """
+        self.max_entries = int(os.getenv("RESULT_CACHE_SIZE", max_entries))
+        self.cache_dir = os.getenv("RESULT_CACHE_DIR", cache_dir or "") or None
+        self.ttl = float(os.getenv("RESULT_CACHE_TTL", ttl))
+
+        # key -> (time stored, result)
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        content: bytes,
+        jd_text: str,
+        model_name: str,
+        weights: Dict[str, float],
+        llm_model: str = ""
+    ) -> str:
+        """
+        Build a content-addressed cache key.
+
+        Args:
+            content: Raw uploaded file bytes
+            jd_text: Normalized (cleaned) job description text
+            model_name: Embedding model name
+            weights: Scorer weights
+            llm_model: LLM model used for explanations and roadmaps
+
+        Returns:
+            Hex SHA-256 digest identifying the result
+        """
+        hasher = hashlib.sha256()
+        for part in (
+            hashlib.sha256(content).hexdigest(),
+            jd_text,
+            model_name,
+            json.dumps(weights, sort_keys=True),
+            llm_model,
+        ):
+            encoded = part.encode("utf-8")
+            # Length-prefix each part so field boundaries can't collide
+            hasher.update(len(encoded).to_bytes(8, "big"))
+            hasher.update(encoded)
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Cached result, or None on a miss or an expired entry
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+        entry = self._read_disk(key)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Keeps its original store time, so promotion doesn't extend the TTL
+            self._put_memory(key, entry)
+        return entry[1]
+
+    def set(self, key: str, value: Dict) -> None:
+        """
+        Store a result in both tiers.
+
+        Args:
+            key: Key from make_key
+            value: JSON-serializable result
+        """
+        entry = (time.time(), value)
+        with self._lock:
+            self._put_memory(key, entry)
+        self._write_disk(key, entry)
+
+    def clear(self) -> None:
+        """Drop the in-memory tier and reset counters."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        """Return cache size and hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_enabled": self.cache_dir is not None,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0
+            }
+
+    def _expired(self, stored_at: float) -> bool:
+        """Return whether an entry stored at stored_at is past the TTL."""
+        return self.ttl > 0 and time.time() - stored_at > self.ttl
+
+    def _put_memory(self, key: str, entry: Tuple[float, Dict]) -> None:
+        """Insert into the LRU tier, evicting the oldest entries. Caller holds the lock."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        """Return the on-disk path for a key."""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict]]:
+        """Read a (time stored, result) entry from the disk tier, dropping it if expired."""
+        if not self.cache_dir:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        # Files without a store time predate the TTL and are treated as expired
+        stored_at = entry.get("stored_at") if isinstance(entry, dict) else None
+        if not isinstance(stored_at, (int, float)) or self._expired(stored_at):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        return stored_at, entry["result"]
+
+    def _write_disk(self, key: str, entry: Tuple[float, Dict]) -> None:
+        """Atomically write a (time stored, result) entry to the disk tier."""
+        if not self.cache_dir:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        stored_at, value = entry
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "result": value}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Result cache write failed: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
@@ -5,21 +5,95 @@ Handles extraction of text from PDF and DOCX files.
 
 import os
 import re
-from typing import Optional
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
 from io import BytesIO
 
-import PyPDF2
 from docx import Document
 
+from services.pdf_backends import PDFBackend, backend_chain, get_backend, text_quality
+
+
+# Shared by every ResumeParser in the process; created on first parallel parse
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_workers = 0
+_page_pool_lock = threading.Lock()
+
+
+def _get_page_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared page worker pool, creating it on first use."""
+    global _page_pool, _page_pool_workers
+    
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=workers)
+            _page_pool_workers = workers
+        return _page_pool
+
+
+def shutdown_page_pool(wait: bool = True) -> None:
+    """Shut down the shared page worker pool, if it was started."""
+    global _page_pool
+    
+    with _page_pool_lock:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=wait, cancel_futures=True)
+            _page_pool = None
+
+
+def _extract_page_range(backend_name: str, content: bytes, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) of a PDF with one backend. Runs in a page worker process."""
+    return get_backend(backend_name).extract_range(content, start, stop)
+
 
 class ResumeParser:
     """
     Multi-format resume parser supporting PDF and DOCX files.
     Handles multi-page documents with robust text extraction.
+    
+    PDFs go through a chain of extraction backends (see services.pdf_backends):
+    the fastest installed one first, the others only when it fails. Long PDFs
+    can be extracted page-parallel: contiguous page ranges are fanned out to a
+    shared process pool and their text is streamed back in page order.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        pdf_backend: str = "auto",
+        pdf_fallbacks: Optional[str] = None,
+        page_workers: int = 0,
+        parallel_min_pages: int = 8,
+        max_pages: int = 0,
+        max_chars: int = 0,
+        min_text_quality: float = 0.5
+    ):
+        """
+        Initialize the parser.
+        
+        Args:
+            pdf_backend: "auto" (fastest installed), "pypdfium2", "pypdf2" or "pdfminer"
+            pdf_fallbacks: Comma-separated backends tried when pdf_backend fails
+                ("" = none, default = every other installed backend, fastest first)
+            page_workers: Processes used to extract long PDFs (0 or 1 = in-process)
+            parallel_min_pages: Page count from which a PDF is extracted in parallel
+            max_pages: Only the first max_pages pages of a PDF are read (0 = all)
+            max_chars: Extraction stops once this many characters are read and the
+                text is truncated to it (0 = no limit)
+            min_text_quality: Pages whose text_quality() is lower are re-extracted
+                with the fallback backends, keeping the best result
+        """
         self.supported_formats = [".pdf", ".docx", ".doc"]
+        fallbacks = os.getenv("PDF_FALLBACK_BACKENDS", pdf_fallbacks)
+        self.pdf_backends: List[PDFBackend] = backend_chain(
+            os.getenv("PDF_BACKEND", pdf_backend),
+            [name.strip().lower() for name in fallbacks.split(",") if name.strip()] if fallbacks is not None else None
+        )
+        self.page_workers = int(os.getenv("PDF_PAGE_WORKERS", page_workers))
+        self.parallel_min_pages = max(1, int(os.getenv("PDF_PARALLEL_MIN_PAGES", parallel_min_pages)))
+        self.max_pages = int(os.getenv("PDF_MAX_PAGES", max_pages))
+        self.max_chars = int(os.getenv("PARSE_MAX_CHARS", max_chars))
+        self.min_text_quality = float(os.getenv("PDF_MIN_TEXT_QUALITY", min_text_quality))
     
     def extract_text(self, file_path: str) -> str:
         """
@@ -27,10 +101,10 @@ class ResumeParser:
         
         Args:
             file_path: Path to the resume file
-            
+        
         Returns:
             Extracted text content
-            
+        
         Raises:
             ValueError: If file format is not supported
             FileNotFoundError: If file does not exist
@@ -50,18 +124,44 @@ class ResumeParser:
         
         return ""
     
-    def extract_from_bytes(self, content: bytes, filename: str) -> str:
+    @staticmethod
+    def detect_format(content: bytes) -> Optional[str]:
+        """
+        Detect the document format from its magic bytes.
+        
+        Args:
+            content: File content (only the first KB is inspected)
+        
+        Returns:
+            ".pdf", ".docx" or ".doc", or None if the format is not recognized
+        """
+        head = content[:1024]
+        
+        # The PDF header may be preceded by junk bytes within the first KB
+        if b"%PDF-" in head:
+            return ".pdf"
+        if head.startswith(b"PK\x03\x04"):
+            return ".docx"
+        if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+            return ".doc"
+        
+        return None
+    
+    def extract_from_bytes(self, content: bytes, filename: str = "") -> str:
         """
         Extract text from file content bytes.
         
+        The format is sniffed from the content; the filename extension is only
+        used when the magic bytes are not recognized.
+        
         Args:
             content: File content as bytes
-            filename: Original filename (for extension detection)
-            
+            filename: Original filename (fallback for format detection)
+        
         Returns:
             Extracted text content
         """
-        ext = os.path.splitext(filename)[1].lower()
+        ext = self.detect_format(content) or os.path.splitext(filename)[1].lower()
         
         if ext == ".pdf":
             return self._extract_pdf_from_bytes(content)
@@ -70,82 +170,182 @@ class ResumeParser:
         
         raise ValueError(f"Unsupported format: {ext}")
     
-    def _extract_from_pdf(self, file_path: str) -> str:
-        """Extract text from a PDF file using PyPDF2."""
-        text_parts = []
+    def iter_pdf_pages(self, content: bytes) -> Iterator[str]:
+        """
+        Stream the text of a PDF's pages in page order.
+        
+        Pages without text (image-only, blank) and pages past max_pages are
+        skipped. If a backend raises, the next backend in the chain resumes
+        from the page that failed; if it finishes without finding any text, the
+        next backend retries the whole document. Pages whose text_quality() is
+        below min_text_quality are re-extracted with the later backends in one
+        batch at the end of the pass, so pages after the first garbled one are
+        held back until then. PDFs of at least
+        parallel_min_pages pages are split into contiguous page ranges
+        extracted by the shared page worker pool; each range's pages are
+        yielded as soon as it and all earlier ranges finish.
         
+        Args:
+            content: PDF file content
+        
+        Yields:
+            Non-empty page text
+        
+        Raises:
+            RuntimeError: If no backend can parse the PDF
+        """
+        errors = []
+        next_page = 0
+        found_text = False
+        
+        for index, backend in enumerate(self.pdf_backends):
+            # Pages from the first garbled one on wait here, as (page, text),
+            # so the garbled ones are re-extracted together once the pass ends
+            held: List[Tuple[int, str]] = []
+            failed = False
+            try:
+                page_count = backend.page_count(content)
+                if self.max_pages > 0:
+                    page_count = min(page_count, self.max_pages)
+                
+                for page_text in self._iter_backend_pages(backend, content, next_page, page_count):
+                    if held or (page_text and text_quality(page_text) < self.min_text_quality):
+                        held.append((next_page, page_text))
+                    elif page_text:
+                        found_text = True
+                        yield page_text
+                    next_page += 1
+            except Exception as e:
+                errors.append(f"{backend.name}: {str(e)}")
+                failed = True
+            
+            for page_text in self._repair_pages(held, content, self.pdf_backends[index + 1:]):
+                if page_text:
+                    found_text = True
+                    yield page_text
+            if failed:
+                continue
+            
+            if found_text or page_count == 0:
+                return
+            # No text anywhere, e.g. a font encoding this backend can't map
+            next_page = 0
+        
+        if errors and not found_text:
+            raise RuntimeError(f"Failed to parse PDF: {'; '.join(errors)}")
+        if errors:
+            print(f"Warning: PDF extraction stopped after page {next_page}: {'; '.join(errors)}")
+    
+    def _iter_backend_pages(self, backend: PDFBackend, content: bytes, start: int, stop: int) -> Iterator[str]:
+        """Yield the text of pages [start, stop) from one backend, in-process or from the page pool."""
+        if self.page_workers <= 1 or stop - start < self.parallel_min_pages:
+            yield from backend.iter_pages(content, start, stop)
+            return
+        
+        # Two ranges per worker keeps every worker busy while the first
+        # ranges are already streaming back
+        pool = _get_page_pool(self.page_workers)
+        range_size = -(-(stop - start) // (_page_pool_workers * 2))
+        futures = [
+            pool.submit(_extract_page_range, backend.name, content, range_start, min(range_start + range_size, stop))
+            for range_start in range(start, stop, range_size)
+        ]
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_parts.append(page_text)
-        except Exception as e:
-            raise RuntimeError(f"Failed to parse PDF: {str(e)}")
+            for future in futures:
+                yield from future.result()
+        finally:
+            # Consumer stopped early or a range failed
+            for future in futures:
+                future.cancel()
+    
+    def _repair_pages(self, held: List[Tuple[int, str]], content: bytes, fallbacks: List[PDFBackend]) -> List[str]:
+        """
+        Re-extract the garbled pages among held with the fallback backends.
+        
+        Each fallback reads the document once for all pages still below
+        min_text_quality; every page keeps its most text-like result.
+        
+        Returns:
+            The text of every held page, in page order
+        """
+        texts = dict(held)
+        qualities = {page: text_quality(text) for page, text in held if text}
+        garbled = [page for page, quality in qualities.items() if quality < self.min_text_quality]
         
-        return "\n\n".join(text_parts)
+        for backend in fallbacks:
+            if not garbled:
+                break
+            try:
+                candidates = backend.extract_pages(content, garbled)
+            except Exception:
+                continue
+            for page, candidate in candidates.items():
+                quality = text_quality(candidate)
+                if quality > qualities[page]:
+                    texts[page], qualities[page] = candidate, quality
+            garbled = [page for page in garbled if qualities[page] < self.min_text_quality]
+        
+        return [texts[page] for page, _ in held]
     
-    def _extract_pdf_from_bytes(self, content: bytes) -> str:
-        """Extract text from PDF bytes."""
+    def _join_parts(self, parts: Iterator[str], separator: str) -> str:
+        """Join extracted text parts, stopping early once max_chars is reached."""
+        if self.max_chars <= 0:
+            return separator.join(parts)
+        
         text_parts = []
+        length = 0
+        for part in parts:
+            text_parts.append(part)
+            length += len(part) + len(separator)
+            if length >= self.max_chars:
+                break
+        return separator.join(text_parts)[:self.max_chars]
+    
+    def _extract_from_pdf(self, file_path: str) -> str:
+        """Extract text from a PDF file."""
+        with open(file_path, 'rb') as file:
+            content = file.read()
         
+        return self._extract_pdf_from_bytes(content)
+    
+    def _extract_pdf_from_bytes(self, content: bytes) -> str:
+        """Extract text from PDF bytes."""
+        pages = self.iter_pdf_pages(content)
         try:
-            reader = PyPDF2.PdfReader(BytesIO(content))
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-        except Exception as e:
-            raise RuntimeError(f"Failed to parse PDF: {str(e)}")
+            return self._join_parts(pages, "\n\n")
+        finally:
+            # Stops page workers still extracting past max_chars
+            pages.close()
+    
+    def _iter_docx_parts(self, source) -> Iterator[str]:
+        """Yield a DOCX's non-empty paragraphs, then its table rows."""
+        doc = Document(source)
+        
+        # Extract paragraphs
+        for para in doc.paragraphs:
+            if para.text.strip():
+                yield para.text
         
-        return "\n\n".join(text_parts)
+        # Extract tables
+        for table in doc.tables:
+            for row in table.rows:
+                row_text = " | ".join(cell.text.strip() for cell in row.cells if cell.text.strip())
+                if row_text:
+                    yield row_text
     
     def _extract_from_docx(self, file_path: str) -> str:
         """Extract text from a DOCX file."""
-        text_parts = []
-        
         try:
-            doc = Document(file_path)
-            
-            # Extract paragraphs
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    text_parts.append(para.text)
-            
-            # Extract tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = " | ".join(cell.text.strip() for cell in row.cells if cell.text.strip())
-                    if row_text:
-                        text_parts.append(row_text)
-                        
+            return self._join_parts(self._iter_docx_parts(file_path), "\n")
         except Exception as e:
             raise RuntimeError(f"Failed to parse DOCX: {str(e)}")
-        
-        return "\n".join(text_parts)
     
     def _extract_docx_from_bytes(self, content: bytes) -> str:
         """Extract text from DOCX bytes."""
-        text_parts = []
-        
         try:
-            doc = Document(BytesIO(content))
-            
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    text_parts.append(para.text)
-            
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = " | ".join(cell.text.strip() for cell in row.cells if cell.text.strip())
-                    if row_text:
-                        text_parts.append(row_text)
-                        
+            return self._join_parts(self._iter_docx_parts(BytesIO(content)), "\n")
         except Exception as e:
             raise RuntimeError(f"Failed to parse DOCX: {str(e)}")
-        
-        return "\n".join(text_parts)
     
     def extract_sections(self, text: str) -> dict:
         """
@@ -153,7 +353,7 @@ class ResumeParser:
         
         Args:
             text: Resume text content
-            
+        
         Returns:
             Dictionary with section names as keys and content as values
         """
@@ -3,11 +3,25 @@ Resume Scoring Service
 Calculates comprehensive match scores between resumes and job descriptions.
 """
 
-from typing import Dict, List, Optional
-import re
+from typing import Callable, Dict, List, Optional, Union
+import os
 import numpy as np
 
 from services.embedder import Embedder
+from utils.parsed_document import (
+    EXPERIENCE_SECTION_PATTERNS,
+    REQUIRED_YEARS_PATTERNS,
+    REQUIREMENTS_SECTION_PATTERNS,
+    SKILLS_SECTION_PATTERNS,
+    STATED_YEARS_PATTERNS,
+    ParsedDocument,
+    find_job_title,
+    find_keywords,
+    find_section,
+    find_years,
+)
+
+Document = Union[str, ParsedDocument]
 
 
 class ResumeScorer:
@@ -16,14 +30,29 @@ class ResumeScorer:
     Combines semantic similarity with keyword analysis for accurate scoring.
     """
     
-    def __init__(self, embedder: Optional[Embedder] = None):
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        chunked: bool = False,
+        chunk_size: int = 150,
+        chunk_overlap: int = 30
+    ):
         """
         Initialize the scorer.
         
         Args:
             embedder: Embedder instance for semantic similarity. Creates new one if not provided.
+            chunked: Split long texts into overlapping word chunks instead of
+                letting the model truncate them at its token limit
+            chunk_size: Words per chunk (150 words stays under MiniLM's 256 tokens)
+            chunk_overlap: Words shared by consecutive chunks
         """
         self.embedder = embedder or Embedder()
+        self.chunked = os.getenv("SCORER_CHUNKED", str(chunked)).lower() == "true"
+        self.chunk_size = int(os.getenv("SCORER_CHUNK_WORDS", chunk_size))
+        self.chunk_overlap = int(os.getenv("SCORER_CHUNK_OVERLAP", chunk_overlap))
+        if self.chunked and not 0 <= self.chunk_overlap < self.chunk_size:
+            raise ValueError("SCORER_CHUNK_OVERLAP must be smaller than SCORER_CHUNK_WORDS")
         
         # Scoring weights (must sum to 1.0)
         self.weights = {
@@ -33,24 +62,88 @@ class ResumeScorer:
             "role_alignment": 0.20
         }
     
-    def calculate_score(self, resume_text: str, jd_text: str) -> Dict:
+    @property
+    def model_key(self) -> str:
+        """Embedding model key plus the scoring mode, for result cache keys."""
+        if not self.chunked:
+            return self.embedder.model_key
+        return f"{self.embedder.model_key}:chunked-{self.chunk_size}-{self.chunk_overlap}"
+    
+    def calculate_score(self, resume_text: Document, jd_text: Document) -> Dict:
         """
         Calculate comprehensive matching score.
         
+        Every text the sub-scores compare is collected up front and encoded
+        in a single deduplicated batch.
+        
         Args:
-            resume_text: Cleaned resume text
-            jd_text: Cleaned job description text
+            resume_text: Cleaned resume text, or its ParsedDocument
+            jd_text: Cleaned job description text, or its ParsedDocument
             
         Returns:
             Dictionary with overall score and sub-scores
         """
-        # Calculate individual component scores
-        skills_match = self._calculate_skills_match(resume_text, jd_text)
-        experience_relevance = self._calculate_experience_relevance(resume_text, jd_text)
-        keyword_coverage = self._calculate_keyword_coverage(resume_text, jd_text)
-        role_alignment = self._calculate_role_alignment(resume_text, jd_text)
+        resume = self._as_document(resume_text, "resume")
+        jd = self._as_document(jd_text, "jd")
+        similarity_fn = self._matrix_similarity(self._collect_texts(resume, jd))
+        return self._score_pair(resume, jd, similarity_fn)
+    
+    def calculate_scores_batch(
+        self,
+        resume_texts: List[Document],
+        jd_text: Document,
+        batch_size: int = 64
+    ) -> List[Dict]:
+        """
+        Score many resumes against a single job description.
+        
+        The JD is parsed once and its texts appear once in the encoder batch
+        no matter how many resumes are scored, and all resume-side texts
+        share the same batch.
+        
+        Args:
+            resume_texts: Cleaned resume texts, or their ParsedDocuments
+            jd_text: Cleaned job description text, or its ParsedDocument
+            batch_size: Encoder batch size
+            
+        Returns:
+            List of score dictionaries, one per resume, in input order
+        """
+        if not resume_texts:
+            return []
+        
+        jd = self._as_document(jd_text, "jd")
+        resumes = [self._as_document(resume, "resume") for resume in resume_texts]
+        
+        texts = []
+        for resume in resumes:
+            texts.extend(self._collect_texts(resume, jd))
+        similarity_fn = self._matrix_similarity(texts, batch_size=batch_size)
+        
+        return [
+            self._score_pair(resume, jd, similarity_fn)
+            for resume in resumes
+        ]
+    
+    @staticmethod
+    def _as_document(text: Document, kind: str) -> ParsedDocument:
+        """Parse plain text; ParsedDocuments are used as they are."""
+        if isinstance(text, ParsedDocument):
+            return text
+        return ParsedDocument.parse(text, kind)
+    
+    def _score_pair(
+        self,
+        resume: ParsedDocument,
+        jd: ParsedDocument,
+        similarity_fn: Callable[[str, str], float]
+    ) -> Dict:
+        """Compute the score dictionary using the given similarity function."""
+        skills_match = self._calculate_skills_match(resume, jd, similarity_fn)
+        experience_relevance = self._calculate_experience_relevance(resume, jd, similarity_fn)
+        keyword_coverage = self._calculate_keyword_coverage(resume, jd)
+        role_alignment = self._calculate_role_alignment(resume, jd, similarity_fn)
         
-        # Calculate weighted overall score
         overall_score = (
             skills_match * self.weights["skills_match"] +
             experience_relevance * self.weights["experience_relevance"] +
@@ -67,45 +160,111 @@ class ResumeScorer:
             "weights": self.weights
         }
     
-    def _calculate_skills_match(self, resume: str, jd: str) -> float:
+    def _collect_texts(self, resume: ParsedDocument, jd: ParsedDocument) -> List[str]:
+        """List every text the semantic sub-scores compare for one pair."""
+        texts = [resume.text, jd.text, jd.section("requirements", jd.text)]
+        for section in (resume.section("skills"), resume.section("experience")):
+            if section:
+                texts.append(section)
+        return texts
+    
+    def _matrix_similarity(
+        self,
+        texts: List[str],
+        batch_size: int = 32
+    ) -> Callable[[str, str], float]:
+        """
+        Encode texts in one deduplicated batch and build a similarity lookup.
+        
+        In chunked mode every chunk of every text goes into that same batch,
+        and two texts are compared through their chunk-by-chunk similarity
+        matrix: each chunk of the second (JD-side) text takes its best match
+        among the first text's chunks, and those maxima are averaged.
+        
+        Args:
+            texts: Texts that will be compared (duplicates allowed)
+            batch_size: Encoder batch size
+            
+        Returns:
+            Function returning cosine similarity between two of the given texts
+        """
+        unique = list(dict.fromkeys(texts))
+        if self.chunked:
+            chunks = {
+                text: self.embedder.chunk_text(text, self.chunk_size, self.chunk_overlap)
+                for text in unique
+            }
+            encode = list(dict.fromkeys(chunk for text in unique for chunk in chunks[text]))
+        else:
+            encode = unique
+        embeddings = np.asarray(self.embedder.embed_batch(encode, batch_size=batch_size))
+        
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        normalized = embeddings / np.where(norms == 0, 1, norms)
+        row = {text: i for i, text in enumerate(encode)}
+        
+        if not self.chunked:
+            def similarity(text1: str, text2: str) -> float:
+                return float(np.dot(normalized[row[text1]], normalized[row[text2]]))
+            
+            return similarity
+        
+        rows = {text: [row[chunk] for chunk in chunks[text]] for text in unique}
+        
+        def chunked_similarity(text1: str, text2: str) -> float:
+            matrix = normalized[rows[text1]] @ normalized[rows[text2]].T
+            return float(matrix.max(axis=0).mean())
+        
+        return chunked_similarity
+    
+    def _calculate_skills_match(
+        self,
+        resume: ParsedDocument,
+        jd: ParsedDocument,
+        similarity_fn: Optional[Callable[[str, str], float]] = None
+    ) -> float:
         """
         Calculate skills matching score using semantic similarity.
         
-        Extracts skill-related sections and compares them semantically.
+        Compares the skill-related sections semantically.
         """
-        # Extract skills sections
-        resume_skills = self._extract_skills_section(resume)
-        jd_requirements = self._extract_requirements_section(jd)
+        similarity_fn = similarity_fn or self.embedder.similarity
+        
+        # Skills sections, located when the documents were parsed
+        resume_skills = resume.section("skills")
+        jd_requirements = jd.section("requirements", jd.text)
         
         if not resume_skills or not jd_requirements:
             # Fall back to full text comparison
-            similarity = self.embedder.similarity(resume, jd)
-            return min(similarity * 100, 100)
+            return min(similarity_fn(resume.text, jd.text) * 100, 100)
         
         # Calculate semantic similarity between skills sections
-        similarity = self.embedder.similarity(resume_skills, jd_requirements)
+        similarity = similarity_fn(resume_skills, jd_requirements)
         
         # Scale to 0-100
         return min(similarity * 120, 100)  # Slight boost for section-specific comparison
     
-    def _calculate_experience_relevance(self, resume: str, jd: str) -> float:
+    def _calculate_experience_relevance(
+        self,
+        resume: ParsedDocument,
+        jd: ParsedDocument,
+        similarity_fn: Optional[Callable[[str, str], float]] = None
+    ) -> float:
         """
         Calculate how relevant the candidate's experience is to the role.
         
         Uses semantic similarity on experience sections.
         """
-        # Extract experience section from resume
-        experience_section = self._extract_experience_section(resume)
+        similarity_fn = similarity_fn or self.embedder.similarity
         
-        if not experience_section:
-            experience_section = resume
+        experience_section = resume.section("experience") or resume.text
         
         # Calculate similarity
-        similarity = self.embedder.similarity(experience_section, jd)
+        similarity = similarity_fn(experience_section, jd.text)
         
         # Look for years of experience match
-        resume_years = self._extract_years_experience(resume)
-        jd_years = self._extract_required_years(jd)
+        resume_years = resume.years_experience
+        jd_years = jd.years_experience
         
         years_bonus = 0
         if resume_years and jd_years:
@@ -116,162 +275,81 @@ class ResumeScorer:
         
         return min((similarity * 100) + years_bonus, 100)
     
-    def _calculate_keyword_coverage(self, resume: str, jd: str) -> float:
+    def _calculate_keyword_coverage(self, resume: ParsedDocument, jd: ParsedDocument) -> float:
         """
         Calculate what percentage of important JD keywords appear in resume.
         """
-        # Extract important keywords from JD
-        jd_keywords = self._extract_important_keywords(jd)
+        jd_keywords = jd.keywords
         
         if not jd_keywords:
             return 50.0  # Neutral score if no keywords found
         
         # Check coverage
-        resume_lower = resume.lower()
-        matched = sum(1 for kw in jd_keywords if kw.lower() in resume_lower)
+        matched = sum(1 for kw in jd_keywords if kw in resume.lower)
         
         coverage = (matched / len(jd_keywords)) * 100
         return min(coverage, 100)
     
-    def _calculate_role_alignment(self, resume: str, jd: str) -> float:
+    def _calculate_role_alignment(
+        self,
+        resume: ParsedDocument,
+        jd: ParsedDocument,
+        similarity_fn: Optional[Callable[[str, str], float]] = None
+    ) -> float:
         """
         Calculate how well the resume aligns with the target role.
         
         Considers job titles, responsibilities, and overall semantic match.
         """
-        # Extract job title from JD
-        jd_title = self._extract_job_title(jd)
+        similarity_fn = similarity_fn or self.embedder.similarity
         
         # Check if similar titles appear in resume
         title_match = 0
-        if jd_title:
-            title_words = set(jd_title.lower().split())
-            resume_lower = resume.lower()
-            matched_words = sum(1 for word in title_words if word in resume_lower)
+        if jd.title:
+            title_words = set(jd.title.lower().split())
+            matched_words = sum(1 for word in title_words if word in resume.lower)
             title_match = (matched_words / max(len(title_words), 1)) * 30
         
         # Calculate overall semantic alignment
-        overall_similarity = self.embedder.similarity(resume, jd)
+        overall_similarity = similarity_fn(resume.text, jd.text)
         
         return min((overall_similarity * 70) + title_match, 100)
     
     def _extract_skills_section(self, text: str) -> str:
         """Extract skills-related content from text."""
-        patterns = [
-            r"(?i)(?:skills|technical skills|core competencies|technologies|tools)[:\s]*([^•\n]+(?:[\n•][^•\n]+)*)",
-            r"(?i)(?:proficient in|experienced with|expertise in)[:\s]*([^.\n]+)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1).strip()
-        
-        return ""
+        span = find_section(text, SKILLS_SECTION_PATTERNS)
+        return text[span[0]:span[1]] if span else ""
     
     def _extract_requirements_section(self, text: str) -> str:
         """Extract requirements from job description."""
-        patterns = [
-            r"(?i)(?:requirements|qualifications|must have|required skills)[:\s]*(.+?)(?=\n\n|responsibilities|benefits|$)",
-            r"(?i)(?:you will need|we are looking for|ideal candidate)[:\s]*(.+?)(?=\n\n|$)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL)
-            if match:
-                return match.group(1).strip()
-        
-        return text  # Return full text if no section found
+        span = find_section(text, REQUIREMENTS_SECTION_PATTERNS)
+        return text[span[0]:span[1]] if span else text  # Full text if no section found
     
     def _extract_experience_section(self, text: str) -> str:
         """Extract experience section from resume."""
-        patterns = [
-            r"(?i)(?:experience|work history|employment)[:\s]*(.+?)(?=\n\n(?:education|skills|projects)|$)",
-            r"(?i)(?:professional experience|career history)[:\s]*(.+?)(?=\n\n|$)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL)
-            if match:
-                return match.group(1).strip()
-        
-        return ""
+        span = find_section(text, EXPERIENCE_SECTION_PATTERNS)
+        return text[span[0]:span[1]] if span else ""
     
     def _extract_years_experience(self, text: str) -> Optional[int]:
         """Extract years of experience from resume."""
-        patterns = [
-            r"(\d+)\+?\s*(?:years?|yrs?)\s*(?:of)?\s*(?:experience|exp)",
-            r"(?:experience|exp)[:\s]*(\d+)\+?\s*(?:years?|yrs?)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-        
-        return None
+        return find_years(text, STATED_YEARS_PATTERNS)
     
     def _extract_required_years(self, text: str) -> Optional[int]:
         """Extract required years from job description."""
-        patterns = [
-            r"(\d+)\+?\s*(?:years?|yrs?)\s*(?:of)?\s*(?:experience|exp)",
-            r"(?:minimum|at least)\s*(\d+)\s*(?:years?|yrs?)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-        
-        return None
+        return find_years(text, REQUIRED_YEARS_PATTERNS)
     
     def _extract_important_keywords(self, text: str) -> List[str]:
         """Extract important keywords from job description."""
-        # Common tech keywords and skills
-        tech_patterns = [
-            r"\b(Python|Java|JavaScript|TypeScript|React|Angular|Vue|Node\.?js)\b",
-            r"\b(AWS|Azure|GCP|Docker|Kubernetes|K8s)\b",
-            r"\b(SQL|NoSQL|MongoDB|PostgreSQL|MySQL|Redis)\b",
-            r"\b(Machine Learning|ML|AI|Deep Learning|NLP|Computer Vision)\b",
-            r"\b(REST|GraphQL|API|Microservices)\b",
-            r"\b(Git|CI/CD|DevOps|Agile|Scrum)\b",
-            r"\b(TensorFlow|PyTorch|Scikit-learn|Pandas|NumPy)\b",
-        ]
-        
-        keywords = set()
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            keywords.update(match.lower() for match in matches)
-        
-        # Also extract capitalized multi-word terms
-        multi_word = re.findall(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\b", text)
-        keywords.update(term.lower() for term in multi_word if len(term) > 5)
-        
-        return list(keywords)
+        return find_keywords(text)
     
     def _extract_job_title(self, text: str) -> Optional[str]:
         """Extract job title from job description."""
-        patterns = [
-            r"(?i)(?:job title|position|role)[:\s]*([^\n]+)",
-            r"(?i)^([^\n]+(?:engineer|developer|manager|analyst|designer|scientist)[^\n]*)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1).strip()
-        
-        # Try first line
-        first_line = text.split("\n")[0].strip()
-        if len(first_line) < 100:  # Reasonable title length
-            return first_line
-        
-        return None
+        return find_job_title(text)
     
     def get_detailed_analysis(
         self,
-        resume_text: str,
-        jd_text: str
+        resume_text: Document,
+        jd_text: Document
     ) -> Dict:
         """
         Get detailed scoring analysis with explanations.
@@ -279,20 +357,19 @@ class ResumeScorer:
         Returns:
             Dictionary with scores, matched keywords, and analysis details
         """
-        scores = self.calculate_score(resume_text, jd_text)
+        resume = self._as_document(resume_text, "resume")
+        jd = self._as_document(jd_text, "jd")
+        scores = self.calculate_score(resume, jd)
         
         # Additional analysis
-        jd_keywords = self._extract_important_keywords(jd_text)
-        resume_lower = resume_text.lower()
-        
-        matched_keywords = [kw for kw in jd_keywords if kw.lower() in resume_lower]
-        missing_keywords = [kw for kw in jd_keywords if kw.lower() not in resume_lower]
+        matched_keywords = [kw for kw in jd.keywords if kw in resume.lower]
+        missing_keywords = [kw for kw in jd.keywords if kw not in resume.lower]
         
         return {
             **scores,
             "matched_keywords": matched_keywords,
             "missing_keywords": missing_keywords,
-            "jd_years_required": self._extract_required_years(jd_text),
-            "resume_years_stated": self._extract_years_experience(resume_text),
-            "job_title_detected": self._extract_job_title(jd_text)
+            "jd_years_required": jd.years_experience,
+            "resume_years_stated": resume.years_experience,
+            "job_title_detected": jd.title
         }
@@ -0,0 +1,97 @@
+"""
+Streaming Service
+Ordered event streams for incremental (SSE / NDJSON) API responses.
+"""
+
+import json
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode an event as a Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def format_ndjson(event: str, data: Any) -> str:
+    """Encode an event as one line of newline-delimited JSON."""
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+class OrderedEventStream:
+    """
+    Merges events produced by concurrent stages into a fixed section order.
+
+    Events for the section currently being streamed go out immediately;
+    events for later sections are buffered until every earlier section has
+    been closed. A client therefore always sees e.g. scores before skills,
+    even when the skills happen to be computed first.
+    """
+
+    _END = object()
+
+    def __init__(self, sections: Iterable[str]):
+        """
+        Args:
+            sections: Section names in the order they must be delivered
+        """
+        self.sections = list(sections)
+        self._buffers: Dict[str, List[Tuple[str, Any]]] = {name: [] for name in self.sections}
+        self._closed = set()
+        self._cursor = 0
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+
+    def emit(self, section: str, event: str, data: Any) -> None:
+        """
+        Publish an event within a section.
+
+        Args:
+            section: Section the event belongs to
+            event: Event name
+            data: JSON-serializable payload
+        """
+        if section not in self._buffers:
+            raise ValueError(f"Unknown section: {section}")
+        if section in self._closed:
+            raise ValueError(f"Section already closed: {section}")
+
+        if self._cursor < len(self.sections) and self.sections[self._cursor] == section:
+            self._queue.put_nowait((event, data))
+        else:
+            self._buffers[section].append((event, data))
+
+    def close(self, section: str) -> None:
+        """
+        Mark a section complete, releasing any buffered later sections.
+
+        Args:
+            section: Section to close
+        """
+        self._closed.add(section)
+
+        while self._cursor < len(self.sections) and self.sections[self._cursor] in self._closed:
+            self._cursor += 1
+            if self._cursor < len(self.sections):
+                for item in self._buffers[self.sections[self._cursor]]:
+                    self._queue.put_nowait(item)
+                self._buffers[self.sections[self._cursor]] = []
+
+        if self._cursor == len(self.sections):
+            self._queue.put_nowait(self._END)
+
+    def fail(self, event: str, data: Any) -> None:
+        """
+        Emit a terminal event immediately and end the stream.
+
+        Buffered events are dropped; nothing is delivered after the failure.
+        """
+        self._queue.put_nowait((event, data))
+        self._queue.put_nowait(self._END)
+
+    async def __aiter__(self) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield (event, data) pairs until the stream ends."""
+        while True:
+            item = await self._queue.get()
+            if item is self._END:
+                return
+            yield item
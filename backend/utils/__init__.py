@@ -5,8 +5,10 @@ Exports all utility classes for the AI Resume Intelligence System.
 
 from utils.text_cleaner import TextCleaner
 from utils.skill_extractor import SkillExtractor
+from utils.parsed_document import ParsedDocument
 
 __all__ = [
     "TextCleaner",
-    "SkillExtractor"
+    "SkillExtractor",
+    "ParsedDocument"
 ]
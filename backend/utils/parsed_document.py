@@ -0,0 +1,202 @@
+"""
+Parsed Document Model
+Immutable parse-once view of a cleaned resume or job description.
+"""
+
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+from utils.text_cleaner import TextCleaner
+
+
+DOCUMENT_KINDS = ("resume", "jd")
+
+# Section patterns, tried in order; the first match's group 1 (stripped) is the section
+SKILLS_SECTION_PATTERNS = [
+    re.compile(r"(?i)(?:skills|technical skills|core competencies|technologies|tools)[:\s]*([^•\n]+(?:[\n•][^•\n]+)*)"),
+    re.compile(r"(?i)(?:proficient in|experienced with|expertise in)[:\s]*([^.\n]+)"),
+]
+EXPERIENCE_SECTION_PATTERNS = [
+    re.compile(r"(?i)(?:experience|work history|employment)[:\s]*(.+?)(?=\n\n(?:education|skills|projects)|$)", re.DOTALL),
+    re.compile(r"(?i)(?:professional experience|career history)[:\s]*(.+?)(?=\n\n|$)", re.DOTALL),
+]
+REQUIREMENTS_SECTION_PATTERNS = [
+    re.compile(r"(?i)(?:requirements|qualifications|must have|required skills)[:\s]*(.+?)(?=\n\n|responsibilities|benefits|$)", re.DOTALL),
+    re.compile(r"(?i)(?:you will need|we are looking for|ideal candidate)[:\s]*(.+?)(?=\n\n|$)", re.DOTALL),
+]
+
+# Years of experience stated in a resume, or required by a job description
+STATED_YEARS_PATTERNS = [
+    re.compile(r"(\d+)\+?\s*(?:years?|yrs?)\s*(?:of)?\s*(?:experience|exp)", re.IGNORECASE),
+    re.compile(r"(?:experience|exp)[:\s]*(\d+)\+?\s*(?:years?|yrs?)", re.IGNORECASE),
+]
+REQUIRED_YEARS_PATTERNS = [
+    re.compile(r"(\d+)\+?\s*(?:years?|yrs?)\s*(?:of)?\s*(?:experience|exp)", re.IGNORECASE),
+    re.compile(r"(?:minimum|at least)\s*(\d+)\s*(?:years?|yrs?)", re.IGNORECASE),
+]
+
+# Common tech keywords and skills looked for in job descriptions
+KEYWORD_PATTERNS = [
+    re.compile(r"\b(Python|Java|JavaScript|TypeScript|React|Angular|Vue|Node\.?js)\b", re.IGNORECASE),
+    re.compile(r"\b(AWS|Azure|GCP|Docker|Kubernetes|K8s)\b", re.IGNORECASE),
+    re.compile(r"\b(SQL|NoSQL|MongoDB|PostgreSQL|MySQL|Redis)\b", re.IGNORECASE),
+    re.compile(r"\b(Machine Learning|ML|AI|Deep Learning|NLP|Computer Vision)\b", re.IGNORECASE),
+    re.compile(r"\b(REST|GraphQL|API|Microservices)\b", re.IGNORECASE),
+    re.compile(r"\b(Git|CI/CD|DevOps|Agile|Scrum)\b", re.IGNORECASE),
+    re.compile(r"\b(TensorFlow|PyTorch|Scikit-learn|Pandas|NumPy)\b", re.IGNORECASE),
+]
+MULTI_WORD_TERM_PATTERN = re.compile(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\b")
+
+JOB_TITLE_PATTERNS = [
+    re.compile(r"(?i)(?:job title|position|role)[:\s]*([^\n]+)"),
+    re.compile(r"(?i)^([^\n]+(?:engineer|developer|manager|analyst|designer|scientist)[^\n]*)"),
+]
+
+
+def find_section(text: str, patterns: Sequence[re.Pattern]) -> Optional[Tuple[int, int]]:
+    """
+    Locate a section with the first matching pattern.
+    
+    Args:
+        text: Text to search
+        patterns: Compiled patterns whose group 1 is the section body
+    
+    Returns:
+        (start, end) of the whitespace-stripped section, or None
+    """
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            start, end = match.span(1)
+            body = match.group(1)
+            start += len(body) - len(body.lstrip())
+            return start, max(start, end - len(body) + len(body.rstrip()))
+    return None
+
+
+def find_years(text: str, patterns: Sequence[re.Pattern]) -> Optional[int]:
+    """Return the number of years captured by the first matching pattern."""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def find_keywords(text: str) -> List[str]:
+    """Extract important (lowercased) keywords from job description text."""
+    keywords = set()
+    for pattern in KEYWORD_PATTERNS:
+        keywords.update(match.lower() for match in pattern.findall(text))
+    
+    # Also extract capitalized multi-word terms
+    keywords.update(term.lower() for term in MULTI_WORD_TERM_PATTERN.findall(text) if len(term) > 5)
+    
+    return list(keywords)
+
+
+def find_job_title(text: str) -> Optional[str]:
+    """Extract the job title from job description text."""
+    for pattern in JOB_TITLE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    
+    # Try first line
+    first_line = text.split("\n")[0].strip()
+    if len(first_line) < 100:  # Reasonable title length
+        return first_line
+    
+    return None
+
+
+@dataclass(frozen=True)
+class ParsedDocument:
+    """
+    Everything the analysis stages read from one cleaned document.
+    
+    Built once per upload (and once per job description) with parse(), then
+    shared by the scorer, skill extractor and LLM stages, so no stage has to
+    re-run sectioning or extraction regexes over the same text.
+    
+    Attributes:
+        text: Cleaned text
+        kind: "resume" or "jd"
+        lower: Lowercased text
+        sections: Section name -> (start, end) span in text. Resumes have
+            "skills" and "experience"; job descriptions have "requirements".
+            A name is only present when its section was found.
+        contacts: Email, phone, LinkedIn and GitHub (None when absent)
+        years_experience: Years stated in a resume, or required by a job description
+        skills: Sorted taxonomy skills, or None when parsed without a skill extractor
+        keywords: Important job description keywords (empty for resumes)
+        title: Job description title (None for resumes)
+    """
+    
+    text: str
+    kind: str
+    lower: str
+    sections: Mapping[str, Tuple[int, int]]
+    contacts: Mapping[str, Optional[str]]
+    years_experience: Optional[int]
+    skills: Optional[Tuple[str, ...]]
+    keywords: Tuple[str, ...]
+    title: Optional[str]
+    
+    @classmethod
+    def parse(cls, text: str, kind: str = "resume", skill_extractor=None) -> "ParsedDocument":
+        """
+        Parse cleaned text once.
+        
+        Args:
+            text: Cleaned resume or job description text
+            kind: "resume" or "jd"
+            skill_extractor: Optional SkillExtractor used to fill skills
+        
+        Returns:
+            ParsedDocument
+        """
+        if kind not in DOCUMENT_KINDS:
+            raise ValueError(f"Unknown document kind: {kind}. Available: {list(DOCUMENT_KINDS)}")
+        
+        sections = {}
+        if kind == "resume":
+            named_patterns = [("skills", SKILLS_SECTION_PATTERNS), ("experience", EXPERIENCE_SECTION_PATTERNS)]
+        else:
+            named_patterns = [("requirements", REQUIREMENTS_SECTION_PATTERNS)]
+        for name, patterns in named_patterns:
+            span = find_section(text, patterns)
+            if span is not None:
+                sections[name] = span
+        
+        skills = None
+        if skill_extractor is not None:
+            extract = skill_extractor.extract_from_resume if kind == "resume" else skill_extractor.extract_from_jd
+            skills = tuple(extract(text))
+        
+        return cls(
+            text=text,
+            kind=kind,
+            lower=text.lower(),
+            sections=MappingProxyType(sections),
+            contacts=MappingProxyType(TextCleaner().extract_contact_info(text)),
+            years_experience=find_years(text, STATED_YEARS_PATTERNS if kind == "resume" else REQUIRED_YEARS_PATTERNS),
+            skills=skills,
+            keywords=tuple(find_keywords(text)) if kind == "jd" else (),
+            title=find_job_title(text) if kind == "jd" else None
+        )
+    
+    def section(self, name: str, default: str = "") -> str:
+        """
+        Return a section's text.
+        
+        Args:
+            name: Section name
+            default: Returned when the section was not found
+        """
+        span = self.sections.get(name)
+        if span is None:
+            return default
+        return self.text[span[0]:span[1]]
@@ -4,9 +4,98 @@ Extracts and matches skills from resumes and job descriptions.
 """
 
 import re
-from typing import List, Set, Dict, Optional
+from typing import Iterable, List, Set, Dict, Union
 from collections import defaultdict
 
+from utils.parsed_document import ParsedDocument
+
+
+class _SkillMatcher:
+    """
+    Finds every taxonomy skill in a text with a single linear regex scan.
+    
+    All skills are compiled into one trie-shaped alternation, so the cost of a
+    scan depends on the text length rather than the taxonomy size. Matching
+    keeps the ``\\b<skill>\\b`` semantics of a per-skill search, including
+    skills that overlap at the same position (e.g. "react" and "react native").
+    """
+    
+    _BOUNDARY = re.compile(r"\b")
+    
+    def __init__(self, skills: Iterable[str]):
+        """
+        Build the automaton.
+        
+        Args:
+            skills: Canonical skill names
+        """
+        # Lowercase form -> canonical name (first occurrence wins)
+        self.names: Dict[str, str] = {}
+        for skill in skills:
+            self.names.setdefault(skill.lower(), skill)
+        
+        trie: Dict = {}
+        for key in self.names:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        
+        # Zero-width lookahead so every start position is visited; the trie
+        # alternation tries longer continuations first and yields the longest
+        # skill that matches at each position.
+        self.pattern = re.compile(r"(?=\b(" + self._trie_regex(trie) + "))")
+        
+        # Shorter skills that are prefixes of each skill. Any other skill that
+        # matches at the same start must be one of these.
+        self.prefixes: Dict[str, List[str]] = {}
+        for key in self.names:
+            node = trie
+            prefixes = []
+            for i, char in enumerate(key[:-1]):
+                node = node[char]
+                if "" in node:
+                    prefixes.append(key[:i + 1])
+            self.prefixes[key] = prefixes
+    
+    @classmethod
+    def _trie_regex(cls, node: Dict) -> str:
+        """Render a trie node as a regex alternation."""
+        branches = [
+            re.escape(char) + cls._trie_regex(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if "" in node:
+            branches.append(r"\b")
+        
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+    
+    def find(self, text_lower: str) -> Set[str]:
+        """
+        Find all skills in lowercased text.
+        
+        Args:
+            text_lower: Lowercased text to scan
+            
+        Returns:
+            Set of canonical skill names
+        """
+        found = set()
+        
+        for match in self.pattern.finditer(text_lower):
+            longest = match.group(1)
+            found.add(longest)
+            
+            start = match.start()
+            for prefix in self.prefixes[longest]:
+                if self._BOUNDARY.match(text_lower, start + len(prefix)):
+                    found.add(prefix)
+        
+        return {self.names[key] for key in found}
+
 
 class SkillExtractor:
     """
@@ -18,6 +107,11 @@ class SkillExtractor:
         """Initialize skill extractor with skill taxonomy."""
         self.skill_categories = self._load_skill_taxonomy()
         self.all_skills = self._flatten_skills()
+        self.matcher = _SkillMatcher(
+            skill
+            for skills in self.skill_categories.values()
+            for skill in skills
+        )
     
     def _load_skill_taxonomy(self) -> Dict[str, List[str]]:
         """Load comprehensive skill taxonomy by category."""
@@ -132,101 +226,43 @@ class SkillExtractor:
             all_skills.update(skill.lower() for skill in skills)
         return all_skills
     
-    def extract_from_jd(self, jd_text: str) -> List[str]:
+    def extract_from_jd(self, jd_text: Union[str, ParsedDocument]) -> List[str]:
         """
         Extract required skills from a job description.
         
         Args:
-            jd_text: Job description text
+            jd_text: Job description text, or its ParsedDocument (whose
+                skills, when already extracted, are returned as they are)
             
         Returns:
             List of extracted skill names
         """
-        found_skills = set()
-        text_lower = jd_text.lower()
-        
-        # Match skills from taxonomy
-        for category, skills in self.skill_categories.items():
-            for skill in skills:
-                skill_lower = skill.lower()
-                # Use word boundary matching
-                pattern = r'\b' + re.escape(skill_lower) + r'\b'
-                if re.search(pattern, text_lower):
-                    found_skills.add(skill)
-        
-        # Also extract skills from requirements section
-        requirements_patterns = [
-            r"(?i)requirements?[:\s]*(.+?)(?=\n\n|responsibilities|benefits|$)",
-            r"(?i)qualifications?[:\s]*(.+?)(?=\n\n|responsibilities|$)",
-            r"(?i)must have[:\s]*(.+?)(?=\n\n|nice to have|$)",
-            r"(?i)required skills?[:\s]*(.+?)(?=\n\n|$)"
-        ]
+        if isinstance(jd_text, ParsedDocument):
+            if jd_text.skills is not None:
+                return list(jd_text.skills)
+            jd_text = jd_text.text
         
-        for pattern in requirements_patterns:
-            match = re.search(pattern, jd_text, re.DOTALL)
-            if match:
-                section = match.group(1)
-                section_skills = self._extract_from_section(section)
-                found_skills.update(section_skills)
-        
-        return sorted(list(found_skills))
+        # The taxonomy scan covers the whole text, requirements section included
+        return sorted(self.matcher.find(jd_text.lower()))
     
-    def extract_from_resume(self, resume_text: str) -> List[str]:
+    def extract_from_resume(self, resume_text: Union[str, ParsedDocument]) -> List[str]:
         """
         Extract skills present in a resume.
         
         Args:
-            resume_text: Resume text
+            resume_text: Resume text, or its ParsedDocument (whose skills,
+                when already extracted, are returned as they are)
             
         Returns:
             List of extracted skill names
         """
-        found_skills = set()
-        text_lower = resume_text.lower()
-        
-        # Match skills from taxonomy
-        for category, skills in self.skill_categories.items():
-            for skill in skills:
-                skill_lower = skill.lower()
-                pattern = r'\b' + re.escape(skill_lower) + r'\b'
-                if re.search(pattern, text_lower):
-                    found_skills.add(skill)
-        
-        # Extract from skills section specifically
-        skills_section = self._extract_skills_section(resume_text)
-        if skills_section:
-            section_skills = self._extract_from_section(skills_section)
-            found_skills.update(section_skills)
-        
-        return sorted(list(found_skills))
-    
-    def _extract_skills_section(self, text: str) -> Optional[str]:
-        """Extract the skills section from resume."""
-        patterns = [
-            r"(?i)(?:skills|technical skills|core competencies|technologies)[:\s]*(.+?)(?=\n\n(?:experience|education|projects)|$)",
-            r"(?i)(?:proficient in|experienced with)[:\s]*(.+?)(?=\n\n|$)"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL)
-            if match:
-                return match.group(1)
-        
-        return None
-    
-    def _extract_from_section(self, section: str) -> Set[str]:
-        """Extract skills from a text section."""
-        found_skills = set()
-        section_lower = section.lower()
-        
-        for category, skills in self.skill_categories.items():
-            for skill in skills:
-                skill_lower = skill.lower()
-                pattern = r'\b' + re.escape(skill_lower) + r'\b'
-                if re.search(pattern, section_lower):
-                    found_skills.add(skill)
+        if isinstance(resume_text, ParsedDocument):
+            if resume_text.skills is not None:
+                return list(resume_text.skills)
+            resume_text = resume_text.text
         
-        return found_skills
+        # The taxonomy scan covers the whole text, skills section included
+        return sorted(self.matcher.find(resume_text.lower()))
     
     def find_missing_skills(
         self,
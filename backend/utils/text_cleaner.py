@@ -8,10 +8,38 @@ import unicodedata
 from typing import Optional
 
 
+BULLET_CHARS = '•●○■□▪▫►▸‣⁃◆◇★☆'
+
+# ASCII control characters other than newline, carriage return and tab
+_ASCII_CONTROL_TABLE = str.maketrans(
+    '', '', ''.join(chr(c) for c in [*range(0x20), 0x7f] if chr(c) not in '\n\r\t')
+)
+_KEPT_CONTROL_CHARS = frozenset('\n\r\t')
+
+_REPEATED_SPACES_PATTERN = re.compile(r' {2,}')
+_TEXT_BULLET_PATTERN = re.compile(r'^[\-\*\+]\s', re.MULTILINE)
+_EXCESS_NEWLINES_PATTERN = re.compile(r'\n{3,}')
+_SENTENCE_END = ('.', '!', '?', ':', ';', '•')
+
+# clean_for_embedding patterns, applied in this order
+_EMBEDDING_PATTERNS = [
+    re.compile(r'https?://\S+'),  # URLs
+    re.compile(r'www\.\S+'),
+    re.compile(r'\S+@\S+\.\S+'),  # Email addresses
+    re.compile(r'\+?[\d\s\-\(\)]{10,}'),  # Phone numbers
+    re.compile(r'^[A-Z][A-Z\s]+(?:\n|$)', re.MULTILINE),  # Resume header lines
+]
+_MULTIPLE_SPACES_PATTERN = re.compile(r' +')
+
+
 class TextCleaner:
     """
     Text cleaning and normalization utility for resume processing.
     Handles various formatting issues and standardizes text for analysis.
+    
+    ASCII-only text (the common case) is fixed up with a single
+    str.translate call and skips Unicode normalization and character
+    category checks entirely.
     """
     
     def __init__(self):
@@ -30,6 +58,16 @@ class TextCleaner:
             '\u00ad': '',   # Soft hyphen
             '\ufeff': '',   # BOM
         }
+        
+        # Every character-level fix, applied before NFC: none of these
+        # characters is produced or consumed by normalization, and no
+        # replacement contains another key
+        self._char_replacements = {
+            **self.unicode_replacements,
+            **{bullet: '•' for bullet in BULLET_CHARS if bullet != '•'},
+            '\t': '    '
+        }
+        self._ascii_table = {**_ASCII_CONTROL_TABLE, ord('\t'): '    '}
     
     def clean(self, text: str) -> str:
         """
@@ -46,7 +84,6 @@ class TextCleaner:
         
         # Apply cleaning steps in order
         text = self._normalize_unicode(text)
-        text = self._remove_control_chars(text)
         text = self._fix_whitespace(text)
         text = self._normalize_bullets(text)
         text = self._fix_line_breaks(text)
@@ -67,91 +104,67 @@ class TextCleaner:
         """
         text = self.clean(text)
         
-        # Remove URLs
-        text = re.sub(r'https?://\S+', '', text)
-        text = re.sub(r'www\.\S+', '', text)
-        
-        # Remove email addresses
-        text = re.sub(r'\S+@\S+\.\S+', '', text)
-        
-        # Remove phone numbers
-        text = re.sub(r'\+?[\d\s\-\(\)]{10,}', '', text)
-        
-        # Remove common resume header patterns
-        text = re.sub(r'^[A-Z][A-Z\s]+(?:\n|$)', '', text, flags=re.MULTILINE)
+        # Remove URLs, emails, phone numbers and header lines
+        for pattern in _EMBEDDING_PATTERNS:
+            text = pattern.sub('', text)
         
         # Collapse multiple spaces
-        text = re.sub(r' +', ' ', text)
+        text = _MULTIPLE_SPACES_PATTERN.sub(' ', text)
         
         return text.strip()
     
     def _normalize_unicode(self, text: str) -> str:
-        """Normalize Unicode characters."""
-        # Replace known problematic characters
-        for old, new in self.unicode_replacements.items():
-            text = text.replace(old, new)
+        """Replace known characters, normalize to NFC and drop control characters."""
+        if text.isascii():
+            return text.translate(self._ascii_table)
         
-        # Normalize to NFC form
-        text = unicodedata.normalize('NFC', text)
+        # str.translate takes a per-character slow path on non-ASCII strings;
+        # replacing only the characters present is much cheaper
+        for old, new in self._char_replacements.items():
+            if old in text:
+                text = text.replace(old, new)
         
-        return text
+        text = unicodedata.normalize('NFC', text)
+        return self._remove_control_chars(text)
     
     def _remove_control_chars(self, text: str) -> str:
-        """Remove control characters except newlines and tabs."""
-        result = []
-        for char in text:
-            if char in '\n\r\t' or not unicodedata.category(char).startswith('C'):
-                result.append(char)
-        return ''.join(result)
+        """Remove control characters (category C) except newlines and tabs."""
+        # Categorize each distinct character once rather than every occurrence
+        for char in set(text) - _KEPT_CONTROL_CHARS:
+            if unicodedata.category(char)[0] == 'C':
+                text = text.replace(char, '')
+        return text
     
     def _fix_whitespace(self, text: str) -> str:
-        """Fix whitespace issues."""
-        # Replace tabs with spaces
-        text = text.replace('\t', '    ')
-        
-        # Remove trailing whitespace from lines
-        lines = [line.rstrip() for line in text.split('\n')]
-        text = '\n'.join(lines)
-        
-        # Collapse multiple spaces (but preserve indentation)
-        text = re.sub(r'(?<! ) +', ' ', text)
-        
-        return text
+        """Strip trailing whitespace from lines and collapse runs of spaces."""
+        text = '\n'.join([line.rstrip() for line in text.split('\n')])
+        return _REPEATED_SPACES_PATTERN.sub(' ', text)
     
     def _normalize_bullets(self, text: str) -> str:
-        """Normalize various bullet point styles."""
-        bullet_chars = ['•', '●', '○', '■', '□', '▪', '▫', '►', '▸', '‣', '⁃', '◆', '◇', '★', '☆']
-        
-        for bullet in bullet_chars:
-            text = text.replace(bullet, '•')
-        
-        # Also normalize common text bullets
-        text = re.sub(r'^[\-\*\+]\s', '• ', text, flags=re.MULTILINE)
-        
-        return text
+        """Normalize common text bullets (symbol bullets are translated earlier)."""
+        return _TEXT_BULLET_PATTERN.sub('• ', text)
     
     def _fix_line_breaks(self, text: str) -> str:
         """Fix line break issues."""
         # Normalize different line endings
-        text = text.replace('\r\n', '\n')
-        text = text.replace('\r', '\n')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
         
         # Fix broken sentences (line break in middle of sentence)
         # Only join if the previous line doesn't end with punctuation
-        lines = text.split('\n')
         result = []
         
-        for i, line in enumerate(lines):
+        for line in text.split('\n'):
             stripped = line.strip()
             if not stripped:
                 result.append('')
                 continue
             
-            # Check if this should be joined with previous line
-            if result and result[-1] and not result[-1].rstrip().endswith(('.', '!', '?', ':', ';', '•')):
-                # Check if current line starts with lowercase
-                if stripped and stripped[0].islower():
-                    result[-1] = result[-1].rstrip() + ' ' + stripped
+            # Join lines starting with lowercase onto the previous line
+            if stripped[0].islower() and result and result[-1]:
+                previous = result[-1].rstrip()
+                if not previous.endswith(_SENTENCE_END):
+                    result[-1] = previous + ' ' + stripped
                     continue
             
             result.append(line)
@@ -161,8 +174,7 @@ class TextCleaner:
     def _remove_excess_newlines(self, text: str) -> str:
         """Remove excessive blank lines."""
         # Replace 3+ consecutive newlines with 2
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        return text
+        return _EXCESS_NEWLINES_PATTERN.sub('\n\n', text)
     
     def extract_contact_info(self, text: str) -> dict:
         """
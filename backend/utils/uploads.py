@@ -0,0 +1,121 @@
+"""
+Upload Utility
+Size-capped upload handling shared by the API layers.
+"""
+
+import os
+from typing import Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.formparsers import MultiPartParser
+
+
+# Per-file cap for resume uploads
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+
+# Allowance for multipart boundaries and form fields on top of the file itself
+FORM_OVERHEAD_BYTES = 1024 * 1024
+
+
+def keep_uploads_in_memory(max_bytes: int = MAX_UPLOAD_BYTES) -> None:
+    """
+    Raise Starlette's multipart spool threshold to the upload cap.
+
+    Starlette buffers each file part in a SpooledTemporaryFile that rolls
+    over to disk past MultiPartParser.spool_max_size (1MB by default), so
+    every resume above 1MB was written to a temp file and read back by
+    read_upload(). With the threshold above the cap, accepted uploads stay
+    in memory; larger ones are rejected by MaxBodySizeMiddleware anyway.
+    Process-wide; call once when building the app.
+
+    Args:
+        max_bytes: Largest upload that should stay in memory
+    """
+    MultiPartParser.spool_max_size = max(MultiPartParser.spool_max_size, max_bytes + 1)
+
+
+def _too_large(max_bytes: int, subject: str = "File") -> HTTPException:
+    """Build the 413 error for an oversized upload."""
+    return HTTPException(
+        status_code=413,
+        detail=f"{subject} too large. Maximum size is {max_bytes // (1024 * 1024)}MB."
+    )
+
+
+async def read_upload(upload: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> bytes:
+    """
+    Read an uploaded file into memory without exceeding a size cap.
+
+    A single bounded read is issued, so at most max_bytes + 1 bytes are ever
+    materialized and the result is handed to the parser without further copies.
+
+    Args:
+        upload: FastAPI upload
+        max_bytes: Maximum allowed file size
+
+    Returns:
+        File content
+
+    Raises:
+        HTTPException: 413 if the file exceeds max_bytes
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    content = await upload.read(max_bytes + 1)
+    if len(content) > max_bytes:
+        raise _too_large(max_bytes)
+
+    return content
+
+
+class MaxBodySizeMiddleware:
+    """
+    ASGI middleware enforcing a request body cap while the body streams in.
+    Requests announcing a larger Content-Length are rejected before any body
+    is read; chunked or lying clients are cut off as soon as the running
+    total crosses the limit, so oversized uploads are never fully buffered.
+    """
+
+    def __init__(self, app, max_bytes: int, path_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            app: Wrapped ASGI application
+            max_bytes: Default body limit in bytes
+            path_limits: Per-path overrides of the body limit
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope.get("path", ""), self.max_bytes)
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                if value.isdigit() and int(value) > limit:
+                    response = JSONResponse(
+                        status_code=413,
+                        content={"detail": _too_large(limit, "Request").detail}
+                    )
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise _too_large(limit, "Request")
+            return message
+
+        await self.app(scope, limited_receive, send)